@@ -1,19 +1,24 @@
 # ai_external.py
 from __future__ import annotations
+import time
 from typing import Dict, Any, List, Tuple, Optional
 from mistralai import Mistral
 
-from utils import content_to_text, parse_json_maybe
+from utils import content_to_text, parse_json_maybe, log_llm_call
 
 
 def _chat(client: Mistral, model: str, messages, temperature: float, top_p: float, max_tokens: int) -> str:
+    started = time.perf_counter()
     resp = client.chat.complete(
         model=model,
         messages=messages,
         max_tokens=max_tokens,
         temperature=temperature,
         top_p=top_p,
+        # JSON-Mode: Decoder ist auf gültiges JSON beschränkt -> Repair-Roundtrip nur noch im Ausnahmefall
+        response_format={"type": "json_object"},
     )
+    log_llm_call(__name__, model, started, resp.usage)
     return content_to_text(resp.choices[0].message.content)
 
 
@@ -1,18 +1,23 @@
 # ai_round.py
 from __future__ import annotations
-from typing import Dict, Any, Tuple, List
+import time
+from typing import Dict, Any, Iterator, Tuple, List
 from mistralai import Mistral
-from utils import content_to_text, parse_json_maybe
+from utils import content_to_text, parse_json_maybe, log_llm_call
 
 
 def _chat(client: Mistral, model: str, messages, temperature: float, top_p: float, max_tokens: int) -> str:
+    started = time.perf_counter()
     resp = client.chat.complete(
         model=model,
         messages=messages,
         max_tokens=max_tokens,
         temperature=temperature,
         top_p=top_p,
+        # JSON-Mode: Decoder ist auf gültiges JSON beschränkt -> Repair-Roundtrip nur noch im Ausnahmefall
+        response_format={"type": "json_object"},
     )
+    log_llm_call(__name__, model, started, resp.usage)
     return content_to_text(resp.choices[0].message.content)
 
 
@@ -125,14 +130,14 @@ def resolve_round_all_countries(
 
     chosen_actions_block = []
     for c, variant in locked_choices.items():
-        display = countries_display.get(c, c)
+        display = countries_display[c]
         text = actions_texts.get(c, {}).get(variant, "")
         chosen_actions_block.append(f"- {display} ({c}): {variant} -> {text}")
     chosen_actions_str = "\n".join(chosen_actions_block)
 
     metrics_block = []
     for c, m in countries_metrics.items():
-        display = countries_display.get(c, c)
+        display = countries_display[c]
         metrics_block.append(
             f"- {display} ({c}): Militär={m['military']}, Stabilität={m['stability']}, Wirtschaft={m['economy']}, "
             f"Diplomatie={m['diplomatic_influence']}, Zustimmung={m['public_approval']}. Ambition: {m['ambition']}"
@@ -243,10 +248,23 @@ Schema:
     return obj
 
 
-def generate_round_summary(
+_SUMMARY_RULES_JSON = """
+Regeln:
+- Gib NUR gültiges JSON zurück, Schema: { "summary": "..." }
+- "summary" ist ein String mit 2–4 Bulletpoints (jede Zeile beginnt mit "- ").
+- Maximal ~520 Zeichen.
+""".strip()
+
+_SUMMARY_RULES_TEXT = """
+Regeln:
+- Gib NUR die 2–4 Bulletpoints als Klartext zurück (kein JSON, keine Überschrift).
+- Jede Zeile beginnt mit "- ".
+- Maximal ~520 Zeichen.
+""".strip()
+
+
+def _round_summary_prompt(
     *,
-    api_key: str,
-    model: str,
     round_no: int,
     memory_in: List[Tuple[int, str]] | None,
     eu_before: Dict[str, Any],
@@ -255,12 +273,8 @@ def generate_round_summary(
     domestic_events: List[Dict[str, Any]] | None,
     chosen_actions_str: str,
     result_obj: Dict[str, Any],
-    temperature: float = 0.4,
-    top_p: float = 0.95,
-    max_tokens: int = 520,
+    rules: str,
 ) -> str:
-    client = Mistral(api_key=api_key)
-
     memory_str = "Keine."
     if memory_in:
         rev = list(reversed(memory_in))
@@ -280,9 +294,7 @@ def generate_round_summary(
             lines.append(f"- {e.get('country')}: {e.get('headline')} (crazy={e.get('craziness',0)}/100)")
         domestic_str = "\n".join(lines)
 
-    schema_hint = """{ "summary": "..." }"""
-
-    prompt = f"""
+    return f"""
 Du bist Chronist eines EU-Geopolitik-Spiels.
 Erstelle eine sehr kurze Zusammenfassung der Runde {round_no} als 2–4 Bulletpoints.
 
@@ -307,12 +319,42 @@ Inputs:
 - Ergebnis (Deltas):
 {result_obj}
 
-Regeln:
-- Gib NUR gültiges JSON zurück, Schema: {schema_hint}
-- "summary" ist ein String mit 2–4 Bulletpoints (jede Zeile beginnt mit "- ").
-- Maximal ~520 Zeichen.
+{rules}
 """.strip()
 
+
+def generate_round_summary(
+    *,
+    api_key: str,
+    model: str,
+    round_no: int,
+    memory_in: List[Tuple[int, str]] | None,
+    eu_before: Dict[str, Any],
+    eu_after: Dict[str, Any],
+    external_events: List[Dict[str, Any]] | None,
+    domestic_events: List[Dict[str, Any]] | None,
+    chosen_actions_str: str,
+    result_obj: Dict[str, Any],
+    temperature: float = 0.4,
+    top_p: float = 0.95,
+    max_tokens: int = 520,
+) -> str:
+    client = Mistral(api_key=api_key)
+
+    schema_hint = """{ "summary": "..." }"""
+
+    prompt = _round_summary_prompt(
+        round_no=round_no,
+        memory_in=memory_in,
+        eu_before=eu_before,
+        eu_after=eu_after,
+        external_events=external_events,
+        domestic_events=domestic_events,
+        chosen_actions_str=chosen_actions_str,
+        result_obj=result_obj,
+        rules=_SUMMARY_RULES_JSON,
+    )
+
     raw = _chat(
         client,
         model,
@@ -334,3 +376,63 @@ Regeln:
     if not summary:
         summary = "- (Keine Summary generiert)"
     return summary
+
+
+def generate_round_summary_stream(
+    *,
+    api_key: str,
+    model: str,
+    round_no: int,
+    memory_in: List[Tuple[int, str]] | None,
+    eu_before: Dict[str, Any],
+    eu_after: Dict[str, Any],
+    external_events: List[Dict[str, Any]] | None,
+    domestic_events: List[Dict[str, Any]] | None,
+    chosen_actions_str: str,
+    result_obj: Dict[str, Any],
+    temperature: float = 0.4,
+    top_p: float = 0.95,
+    max_tokens: int = 520,
+) -> Iterator[str]:
+    """
+    Wie generate_round_summary, aber als Klartext-Stream (für st.write_stream).
+    Kein JSON-Mode: halbfertiges JSON wäre beim Mitlesen unbrauchbar.
+    """
+    client = Mistral(api_key=api_key)
+
+    prompt = _round_summary_prompt(
+        round_no=round_no,
+        memory_in=memory_in,
+        eu_before=eu_before,
+        eu_after=eu_after,
+        external_events=external_events,
+        domestic_events=domestic_events,
+        chosen_actions_str=chosen_actions_str,
+        result_obj=result_obj,
+        rules=_SUMMARY_RULES_TEXT,
+    )
+
+    started = time.perf_counter()
+    stream = client.chat.stream(
+        model=model,
+        messages=[
+            {"role": "system", "content": "Antworte ausschließlich mit den Bulletpoints. Kein JSON."},
+            {"role": "user", "content": prompt},
+        ],
+        max_tokens=max_tokens,
+        temperature=temperature,
+        top_p=top_p,
+    )
+    ttft_ms = None
+    usage = None
+    for event in stream:
+        # Usage kommt (falls überhaupt) mit dem letzten Chunk
+        usage = getattr(event.data, "usage", None) or usage
+        choices = event.data.choices
+        if choices:
+            text = content_to_text(choices[0].delta.content)
+            if text:
+                if ttft_ms is None:
+                    ttft_ms = (time.perf_counter() - started) * 1000.0
+                yield text
+    log_llm_call(__name__, model, started, usage, ttft_ms=ttft_ms)
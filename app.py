@@ -1,85 +1,55 @@
+import atexit
 import os
 from pathlib import Path
-from typing import Dict, Any, List
-from logic.game_logic import build_action_prompt, apply_external_modifiers_to_eu, decay_pressures
+from typing import Dict, Any
+from logic.game_logic import apply_external_modifiers_to_eu, decay_pressures
 
 import streamlit as st
 from dotenv import load_dotenv
 
 from logic.gm_flow import render_gm_controls
+from logic.cache import db_version, cached_game_meta, cached_eu_state
 
 
 from countries import (
     COUNTRY_DEFS,
+    COUNTRIES,
+    COUNTRY_DISPLAY,
     EU_DEFAULT,
     EXTERNAL_CRAZY_BASELINE_RANGES,
 )
-from ui.components import inject_css, VALUE_HELP, compact_kv, metric_with_info
-from logic.helpers import (
-    summarize_recent_actions,
-    format_external_events,
-    impact_preview_text,
-)
+from ui.components import inject_css
 from ui.panels import (
-    render_my_metrics_panel,
     render_news_panel,
     render_public_dashboard,
+    render_round_history,
     render_player_view,
+    render_round_status,
+    render_status_panel,
     _progress_from_conditions,
 )
 
 
 from db import (
     get_conn,
+    transaction,
     ensure_schema,
     seed_countries_if_missing,
     reset_all_countries,
-    load_country_metrics,
-    load_all_country_metrics,
-    load_recent_history,
-    get_eu_state,
     set_eu_state,
-    get_game_meta,
     set_game_meta,
-    set_game_over,
     clear_game_over,
-    clear_round_data,
-    upsert_round_actions,
-    get_round_actions,
-    get_round_action_impacts,
-    lock_choice,
-    get_locks,
-    all_locked,
-    apply_country_deltas,
-    insert_turn_history,
-    get_recent_round_summaries,
-    upsert_round_summary,
     clear_all_round_summaries,
-    get_policy_locks,
-    all_policies_locked,
     # snapshots/dashboard
-    upsert_country_snapshot,
-    get_country_snapshots,
     clear_country_snapshots,
-    # external
-    clear_external_events,
-    upsert_external_event,
-    get_external_events,
     # auth
     create_user,
     verify_user,
     list_users,
     delete_user,
-    get_max_snapshot_round,
-    # domestic
-    clear_domestic_events,
-    upsert_domestic_event,
-    get_domestic_events,
     clear_all_events_and_history,
 )
 
-from ai_round import generate_actions_for_country, resolve_round_all_countries, generate_round_summary
-from ai_external import generate_external_moves, generate_domestic_events
 
 
 # Optional: win.py (falls vorhanden)
@@ -108,26 +78,49 @@ def load_env():
     load_dotenv(env_path)
 
 
+@st.cache_resource
+def _load_config() -> Dict[str, str]:
+    """Einmal pro Prozess: .env lesen statt bei jedem Rerun (Änderungen an .env brauchen einen Neustart)."""
+    load_env()
+    return {
+        "api_key": (os.getenv("MISTRAL_API_KEY") or "").strip(),
+        "gm_pin": (os.getenv("GM_PIN") or "").strip(),
+    }
+
+
+@st.cache_resource
+def _bootstrap() -> Dict[str, Any]:
+    """Einmal pro Prozess: Connection öffnen, Schema/Seed sicherstellen, Länderlisten ableiten."""
+    conn = get_conn()
+    ensure_schema(conn)
+    seed_countries_if_missing(conn, COUNTRY_DEFS)
+    # Nie pro Rerun schließen; erst beim Prozessende (close() checkpointet das WAL zurück in game.db)
+    atexit.register(conn.close)
+    return {
+        "conn": conn,
+        "countries": list(COUNTRIES),
+        "display": COUNTRY_DISPLAY,
+    }
+
+
 # ----------------------------
 # App start
 # ----------------------------
 st.title("yourope - save europe, save yourself")
 
-load_env()
-
-api_key = (os.getenv("MISTRAL_API_KEY") or "").strip()
+config = _load_config()
+api_key = config["api_key"]
 if not api_key:
+    _load_config.clear()  # nach Anlegen der .env beim nächsten Rerun neu lesen
     st.error("MISTRAL_API_KEY fehlt. Lege eine .env neben app.py an: MISTRAL_API_KEY=... ")
     st.stop()
 
-gm_pin = (os.getenv("GM_PIN") or "").strip()
+gm_pin = config["gm_pin"]
 
-conn = get_conn()
-ensure_schema(conn)
-seed_countries_if_missing(conn, COUNTRY_DEFS)
-
-countries = list(COUNTRY_DEFS.keys())
-countries_display = {k: COUNTRY_DEFS[k]["display_name"] for k in countries}
+boot = _bootstrap()
+conn = boot["conn"]  # prozessweit geteilt -> nicht schließen
+countries = boot["countries"]
+countries_display = boot["display"]
 
 # ----------------------------
 # Auth gate
@@ -151,7 +144,6 @@ if st.session_state.auth is None:
             st.rerun()
 
     st.info("Bitte einloggen. (User werden vom Game Master erstellt.)")
-    conn.close()
     st.stop()
 
 auth = st.session_state.auth
@@ -171,7 +163,6 @@ if is_gm and gm_pin:
     entered = st.sidebar.text_input("GM PIN", type="password")
     if entered != gm_pin:
         st.sidebar.warning("PIN erforderlich.")
-        conn.close()
         st.stop()
 
 # GM: Spieleransicht simulieren
@@ -187,7 +178,7 @@ if is_gm:
             value=st.session_state.gm_view_enabled,
         )
         if st.session_state.gm_view_enabled:
-            opts = list(COUNTRY_DEFS.keys())
+            opts = countries
             if st.session_state.gm_view_country not in opts:
                 st.session_state.gm_view_country = opts[0]
             st.session_state.gm_view_country = st.selectbox(
@@ -208,62 +199,40 @@ elif not is_gm:
 
 if not is_gm and not effective_country:
     st.error("Kein Land zugewiesen. GM muss dir ein Land zuweisen.")
-    conn.close()
     st.stop()
 
 # ----------------------------
 # DB states
 # ----------------------------
-meta = get_game_meta(conn)
+meta = cached_game_meta(conn, db_version(conn))
 round_no = meta["round"]
 phase = meta["phase"]
 winner_country = meta.get("winner_country")
 winner_round = meta.get("winner_round")
 
-eu = get_eu_state(conn)
-if not eu["global_context"]:
-    set_eu_state(
-        conn,
-        cohesion=EU_DEFAULT.get("cohesion", eu["cohesion"]),
-        global_context=EU_DEFAULT.get("global_context", ""),
-        threat_level=eu["threat_level"],
-        frontline_pressure=eu["frontline_pressure"],
-        energy_pressure=eu["energy_pressure"],
-        migration_pressure=eu["migration_pressure"],
-        disinfo_pressure=eu["disinfo_pressure"],
-        trade_war_pressure=eu["trade_war_pressure"],
-    )
-    eu = get_eu_state(conn)
+eu = cached_eu_state(conn, db_version(conn))
+if not eu.global_context:
+    # Geteilte Connection: auch dieser Erst-Render-Write nur unter Write-Lock, sonst committet er fremde halbe Runden mit
+    with transaction(conn):
+        set_eu_state(
+            conn,
+            cohesion=EU_DEFAULT.get("cohesion", eu.cohesion),
+            global_context=EU_DEFAULT.get("global_context", ""),
+            threat_level=eu.threat_level,
+            frontline_pressure=eu.frontline_pressure,
+            energy_pressure=eu.energy_pressure,
+            migration_pressure=eu.migration_pressure,
+            disinfo_pressure=eu.disinfo_pressure,
+            trade_war_pressure=eu.trade_war_pressure,
+            commit=False,
+        )
+    eu = cached_eu_state(conn, db_version(conn))
 
 # ----------------------------
 # Sidebar: Rundenstatus
 # ----------------------------
-with st.sidebar.expander("📊 Rundenstatus", expanded=False):
-    st.write(f"**Runde:** {round_no}  |  **Phase:** {phase}")
-    if phase == "game_over" and winner_country:
-        st.success(f"🏆 Gewinner: {countries_display.get(winner_country, winner_country)} (R{winner_round})")
-
-    locks = get_policy_locks(conn, round_no=round_no)
-    st.write("**Lock-Status (diese Runde)**")
-    for c in countries:
-        name = countries_display[c]
-        lc = locks.get(c) or {}
-        f = lc.get("foreign")
-        d = lc.get("domestic")
-
-        if f and d:
-            if is_gm:
-                st.success(f"{name}: ✅ eingelockt (Außen: {f} | Innen: {d})")
-            else:
-                st.success(f"{name}: ✅ eingelockt")
-        elif f or d:
-            if is_gm:
-                st.warning(f"{name}: ⏳ teilweise (Außen: {f or '—'} | Innen: {d or '—'})")
-            else:
-                st.warning(f"{name}: ⏳ teilweise eingelockt")
-        else:
-            st.warning(f"{name}: ⏳ nicht eingelockt")
-
+with st.sidebar:
+    render_round_status(conn, countries=countries, countries_display=countries_display, is_gm=is_gm)
 
 
 # ----------------------------
@@ -278,11 +247,12 @@ if is_gm:
             new_role = st.selectbox("Rolle", ["player", "gm"], index=0)
             new_country = None
             if new_role == "player":
-                new_country = st.selectbox("Land zuweisen", list(COUNTRY_DEFS.keys()))
+                new_country = st.selectbox("Land zuweisen", COUNTRIES)
             submitted = st.form_submit_button("User anlegen/aktualisieren")
         if submitted:
             try:
-                create_user(conn, username=new_u, password=new_p, role=new_role, country=new_country)
+                with transaction(conn):
+                    create_user(conn, username=new_u, password=new_p, role=new_role, country=new_country)
                 st.success("User gespeichert.")
                 st.rerun()
             except Exception as e:
@@ -295,7 +265,8 @@ if is_gm:
 
         del_u = st.text_input("Username löschen")
         if st.button("User löschen"):
-            delete_user(conn, del_u)
+            with transaction(conn):
+                delete_user(conn, del_u)
             st.success("Gelöscht.")
             st.rerun()
 
@@ -306,25 +277,27 @@ if is_gm:
     st.sidebar.write("---")
     st.sidebar.subheader("Reset")
     if st.sidebar.button("💣 Reset alle"):
-        reset_all_countries(conn, COUNTRY_DEFS)
-        clear_all_round_summaries(conn)
-        clear_country_snapshots(conn)
-        clear_game_over(conn)
-
-        clear_all_events_and_history(conn)  # <-- neu, statt loop
-
-        set_eu_state(
-            conn,
-            cohesion=EU_DEFAULT.get("cohesion", 75),
-            global_context=EU_DEFAULT.get("global_context", ""),
-            threat_level=35,
-            frontline_pressure=30,
-            energy_pressure=25,
-            migration_pressure=25,
-            disinfo_pressure=25,
-            trade_war_pressure=25,
-        )
-        set_game_meta(conn, 1, "setup")
+        with transaction(conn):
+            reset_all_countries(conn, COUNTRY_DEFS, commit=False)
+            clear_all_round_summaries(conn, commit=False)
+            clear_country_snapshots(conn, commit=False)
+            clear_game_over(conn, commit=False)
+
+            clear_all_events_and_history(conn, commit=False)  # <-- neu, statt loop
+
+            set_eu_state(
+                conn,
+                cohesion=EU_DEFAULT.get("cohesion", 75),
+                global_context=EU_DEFAULT.get("global_context", ""),
+                threat_level=35,
+                frontline_pressure=30,
+                energy_pressure=25,
+                migration_pressure=25,
+                disinfo_pressure=25,
+                trade_war_pressure=25,
+                commit=False,
+            )
+            set_game_meta(conn, 1, "setup", commit=False)
         st.rerun()
 
 
@@ -341,54 +314,7 @@ if st.sidebar.button("🔄 Aktualisieren"):
     st.rerun()
 
 with right:
-    my_metrics = None
-    if panel_country:
-        my_metrics = load_country_metrics(conn, panel_country)
-        if my_metrics:
-            render_my_metrics_panel(my_metrics, countries_display[panel_country])
-        else:
-            st.warning("Eigene Länderwerte konnten nicht geladen werden.")
-    else:
-        st.info("Kein Land aktiv.")
-
-    st.write("---")
-
-    st.subheader("EU & Druckwerte")
-    metric_with_info("EU Kohäsion", f"{eu['cohesion']}%", VALUE_HELP["EU Kohäsion"])
-
-    compact_kv("Threat", f"{eu['threat_level']}/100", VALUE_HELP["Threat"])
-    compact_kv("Frontline", f"{eu['frontline_pressure']}/100", VALUE_HELP["Frontline"])
-    compact_kv("Energy", f"{eu['energy_pressure']}/100", VALUE_HELP["Energy"])
-    compact_kv("Migration", f"{eu['migration_pressure']}/100", VALUE_HELP["Migration"])
-    with st.expander("Mehr Details (Druckwerte)", expanded=False):
-        compact_kv("Disinfo", f"{eu['disinfo_pressure']}/100", VALUE_HELP["Disinfo"])
-        compact_kv("TradeWar", f"{eu['trade_war_pressure']}/100", VALUE_HELP["TradeWar"])
-
-    st.write("---")
-
-    st.subheader("🏁 Siegfortschritt")
-    if not panel_country or not my_metrics:
-        st.caption("Siegfortschritt wird angezeigt, sobald ein Land aktiv ist.")
-    elif evaluate_country_win_conditions is None:
-        st.caption("Siegbedingungen-Modul nicht geladen.")
-    else:
-        eu_now = get_eu_state(conn)
-        is_winner, cond_results = evaluate_country_win_conditions(
-            panel_country,
-            country_metrics=my_metrics,
-            eu_state=eu_now,
-            country_defs=COUNTRY_DEFS,
-        )
-        if not cond_results:
-            st.warning("Für dieses Land sind noch keine Siegbedingungen definiert (countries.py: win_conditions).")
-        else:
-            prog = _progress_from_conditions(cond_results)
-            st.progress(int(prog))
-            st.caption(f"{prog:.0f}% der Siegbedingungen erfüllt.")
-            if is_winner:
-                st.success("✅ Siegbedingungen erfüllt! Du hast gewonnen.")
-            for r in cond_results:
-                st.write(("✅ " if r.ok else "❌ ") + f"{r.label} (aktuell: {r.current})")
+    render_status_panel(conn, panel_country=panel_country, countries_display=countries_display)
 
 # ----------------------------
 # CENTER: Game Over Banner + News + Dashboard + Actions
@@ -396,7 +322,7 @@ with right:
 with center:
     if phase == "game_over":
         if winner_country:
-            st.success(f"🏆 GAME OVER — Gewinner: {countries_display.get(winner_country, winner_country)} (Runde {winner_round})")
+            st.success(f"🏆 GAME OVER — Gewinner: {countries_display[winner_country]} (Runde {winner_round})")
         else:
             st.success("🏁 GAME OVER")
         st.balloons()
@@ -413,64 +339,16 @@ with center:
         )
         st.write("---")
      # --- NEU: Runden-Historie (Außenmächte + Länderaktionen) ---
-    with st.expander("🕰️ Runden-Historie (Außenmächte + Innenpolitik + Aktionen)", expanded=False):
-        # Welche Runden existieren? (aus turn_history UND external_events)
-        cur = conn.cursor()
-        cur.execute("SELECT DISTINCT round FROM turn_history ORDER BY round DESC")
-        rounds_from_turns = [int(r[0]) for r in cur.fetchall()]
-
-        cur.execute("SELECT DISTINCT round FROM external_events ORDER BY round DESC")
-        rounds_from_external = [int(r[0]) for r in cur.fetchall()]
-
-        cur.execute("SELECT DISTINCT round FROM domestic_events ORDER BY round DESC")
-        rounds_from_domestic = [int(r[0]) for r in cur.fetchall()]
-
-        all_rounds = sorted(set(rounds_from_turns + rounds_from_external + rounds_from_domestic), reverse=True)
-
-
-        if not all_rounds:
-            st.caption("Noch keine Historie vorhanden.")
-        else:
-            # Optional: kompakt zuerst die neueste Runde anzeigen
-            for r in all_rounds:
-                with st.expander(f"Runde {r}", expanded=(r == all_rounds[0])):
-                    # 1) Außenmächte dieser Runde
-                    ext_events_r = get_external_events(conn, r)
-                    if ext_events_r:
-                        st.markdown("**🌐 Außenmächte**")
-                        for e in ext_events_r:
-                            c = int(e.get("craziness", 0) or 0)
-                            st.markdown(f"- **{e['actor']}** (🎲 {c}/100): {e['headline']}")
-                            q = (e.get("quote") or "").strip()
-                            if q and q != "—":
-                                st.caption(f"🗣️ {q}")
-                    else:
-                        st.caption("Keine Außenmächte-Moves für diese Runde.")
-
-                    st.write("---")
-
-                    # 2) Aktionen der Länder dieser Runde (aus turn_history)
-                    st.markdown("**🏛️ Länderaktionen**")
-                    cur.execute(
-                        """
-                        SELECT country, action_public, global_context
-                        FROM turn_history
-                        WHERE round = ?
-                        ORDER BY country ASC
-                        """,
-                        (int(r),),
-                    )
-                    rows = cur.fetchall()
-                    if not rows:
-                        st.caption("Keine Länderaktionen gespeichert (evtl. Runde noch nicht resolved).")
-                    else:
-                        for country, action_public, global_context in rows:
-                            name = countries_display.get(country, country)
-                            st.markdown(f"**{name}**")
-                            st.write(action_public)
-                            if global_context:
-                                st.caption(f"Kontext: {global_context}")
-    
+    # on_change="rerun" + .open: eingeklappt (Default) wird die Historie gar nicht erst gelesen/gerendert
+    history_exp = st.expander(
+        "🕰️ Runden-Historie (Außenmächte + Innenpolitik + Aktionen)",
+        expanded=False,
+        key="history_open",
+        on_change="rerun",
+    )
+    if history_exp.open:
+        with history_exp:
+            render_round_history(conn, countries_display=countries_display)
 
     with st.expander("📊 Dashboard (öffentlich)", expanded=(phase == "game_over")):
         render_public_dashboard(conn, countries=countries, countries_display=countries_display)
@@ -527,5 +405,3 @@ with right:
             progress_from_conditions=_progress_from_conditions,
             evaluate_all_countries=evaluate_all_countries,
         )
-
-conn.close()
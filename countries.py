@@ -1,6 +1,8 @@
 # countries.py
+from types import MappingProxyType
 
-COUNTRY_DEFS = {
+# Read-only: Defaults werden von Reset/Seed/Siegprüfung nur gelesen, nie verändert.
+COUNTRY_DEFS = MappingProxyType({
     "Germany": {
         "display_name": "Deutschland",
         "military": 70,
@@ -81,7 +83,20 @@ COUNTRY_DEFS = {
         ],
         "Leader": "Viktor",
     },
-}
+})
+
+# Länder-Keys in fester Reihenfolge, einmal beim Import
+COUNTRIES = tuple(COUNTRY_DEFS)
+
+
+class DisplayNames(dict):
+    """Anzeigenamen-Lookup: unbekannte Keys (z.B. Außenmächte) fallen auf den Key selbst zurück."""
+
+    def __missing__(self, key: str) -> str:
+        return key
+
+
+COUNTRY_DISPLAY = DisplayNames({k: v["display_name"] for k, v in COUNTRY_DEFS.items()})
 
 EU_DEFAULT = {
     "cohesion": 75,
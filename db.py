@@ -1,4 +1,7 @@
 import sqlite3
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
 from typing import Dict, Any, List, Tuple, Optional
 import json
 import os
@@ -9,9 +12,52 @@ from utils import clamp_int
 
 DB_PATH = "game.db"
 
+# Die Connection wird prozessweit über alle Sessions geteilt (st.cache_resource in app.py).
+# Ohne Lock würde ein conn.commit() einer anderen Session eine halb geschriebene Runde festschreiben.
+_WRITE_LOCK = threading.RLock()
+# Zählt abgeschlossene transaction()-Blöcke (Commit UND Rollback) -> Cache-Key in logic/cache.py
+_TX_SEQ = 0
+
 
 def get_conn() -> sqlite3.Connection:
-    return sqlite3.connect(DB_PATH, check_same_thread=False)
+    # ~100 verschiedene Statements in diesem Modul: Statement-Cache über dem Default (128),
+    # damit auf der geteilten Connection nichts aus dem LRU fällt und neu geparst wird
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False, cached_statements=256)
+    # WAL: Leser blockieren Schreiber nicht; mmap + größerer Page-Cache sparen read()-Syscalls.
+    # busy_timeout: ein zweiter Prozess (z.B. sqlite3-CLI, zweite Streamlit-Instanz) wartet statt "database is locked".
+    conn.executescript("""
+        PRAGMA journal_mode=WAL;
+        PRAGMA synchronous=NORMAL;
+        PRAGMA busy_timeout=5000;
+        PRAGMA mmap_size=268435456;
+        PRAGMA temp_store=MEMORY;
+        PRAGMA cache_size=-20000;
+    """)
+    return conn
+
+
+@contextmanager
+def transaction(conn: sqlite3.Connection):
+    """Write-Lock + eine Transaktion (Commit am Ende, Rollback bei Exception)."""
+    global _TX_SEQ
+    with _WRITE_LOCK:
+        try:
+            with conn:
+                yield conn
+        finally:
+            # Auch nach Rollback: während der Transaktion gecachte (uncommittete) Reads werden damit ungültig
+            _TX_SEQ += 1
+
+
+def committed_version(conn: sqlite3.Connection) -> Tuple[int, int, int, int]:
+    """
+    Watermark über abgeschlossene Writes: (Connection, transaction()-Blöcke, total_changes, PRAGMA data_version).
+    Unter dem Write-Lock gelesen -> nie mitten in einer offenen transaction(); ein Rollback zählt über _TX_SEQ hoch,
+    obwohl total_changes dabei nicht zurückfällt. data_version erfasst Commits anderer Connections (z.B. create_gm.py).
+    """
+    with _WRITE_LOCK:
+        data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+        return (id(conn), _TX_SEQ, conn.total_changes, int(data_version))
 
 
 def _col_exists(conn: sqlite3.Connection, table: str, col: str) -> bool:
@@ -53,6 +99,9 @@ def ensure_schema(conn: sqlite3.Connection) -> None:
         delta_public_approval INTEGER NOT NULL
     )
     """)
+    # Einzige Runden-Tabelle ohne round-Präfix im PK: Historie je Runde + "letzte Aktionen" je Land
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_turn_history_round_country ON turn_history (round, country)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_turn_history_country_id ON turn_history (country, id)")
 
     # EU state (persisted)
     cur.execute("""
@@ -93,6 +142,9 @@ def ensure_schema(conn: sqlite3.Connection) -> None:
         cur.execute("ALTER TABLE game_meta ADD COLUMN winner_round INTEGER")
     if not _col_exists(conn, "game_meta", "winner_reason"):
         cur.execute("ALTER TABLE game_meta ADD COLUMN winner_reason TEXT")
+    # --- Migration: Optimistic Lock für GM-Zustandswechsel ---
+    if not _col_exists(conn, "game_meta", "data_version"):
+        cur.execute("ALTER TABLE game_meta ADD COLUMN data_version INTEGER NOT NULL DEFAULT 0")
 
     # Legacy: Round actions (generated by GM, then published)
     cur.execute("""
@@ -194,6 +246,8 @@ def ensure_schema(conn: sqlite3.Connection) -> None:
         PRIMARY KEY (round, country)
     )
     """)
+    # PK ist (round, country) -> für "neueste Runde je Land" zusätzlich (country, round)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_country_snapshots_country_round ON country_snapshots (country, round)")
 
     # -------------------------
     # NEW: Player-generated policy candidates (up to 3 per domain)
@@ -227,6 +281,8 @@ def ensure_schema(conn: sqlite3.Connection) -> None:
     """)
 
     conn.commit()
+    # Planer-Statistiken für die Indizes oben aktualisieren (billig, analysiert nur wenn nötig)
+    cur.execute("PRAGMA optimize")
 
     # Seed eu_state & game_meta
     cur.execute("SELECT 1 FROM eu_state WHERE id = 1")
@@ -249,37 +305,40 @@ def ensure_schema(conn: sqlite3.Connection) -> None:
 
 
 def seed_countries_if_missing(conn: sqlite3.Connection, country_defs: Dict[str, Dict[str, Any]]) -> None:
-    cur = conn.cursor()
-    for name, data in country_defs.items():
-        cur.execute("SELECT 1 FROM countries WHERE name = ?", (name,))
-        if cur.fetchone() is None:
-            cur.execute("""
-                INSERT INTO countries (name, military, stability, economy, diplomatic_influence, public_approval, ambition)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, (
-                name,
-                int(data["military"]),
-                int(data["stability"]),
-                int(data["economy"]),
-                int(data["diplomatic_influence"]),
-                int(data["public_approval"]),
-                str(data["ambition"]),
-            ))
+    """Fehlende Länder anlegen; vorhandene bleiben unangetastet (ON CONFLICT DO NOTHING statt SELECT je Land)."""
+    conn.executemany("""
+        INSERT INTO countries (name, military, stability, economy, diplomatic_influence, public_approval, ambition)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(name) DO NOTHING
+    """, [
+        (
+            name,
+            int(data["military"]),
+            int(data["stability"]),
+            int(data["economy"]),
+            int(data["diplomatic_influence"]),
+            int(data["public_approval"]),
+            str(data["ambition"]),
+        )
+        for name, data in country_defs.items()
+    ])
     conn.commit()
 
 
-def reset_country_to_defaults(conn: sqlite3.Connection, country: str, defaults: Dict[str, Any]) -> None:
-    cur = conn.cursor()
-    cur.execute("""
-        UPDATE countries SET
-            military = ?,
-            stability = ?,
-            economy = ?,
-            diplomatic_influence = ?,
-            public_approval = ?,
-            ambition = ?
-        WHERE name = ?
-    """, (
+_COUNTRY_RESET_UPDATE = """
+    UPDATE countries SET
+        military = ?,
+        stability = ?,
+        economy = ?,
+        diplomatic_influence = ?,
+        public_approval = ?,
+        ambition = ?
+    WHERE name = ?
+"""
+
+
+def _country_reset_params(country: str, defaults: Dict[str, Any]) -> Tuple:
+    return (
         int(defaults["military"]),
         int(defaults["stability"]),
         int(defaults["economy"]),
@@ -287,20 +346,51 @@ def reset_country_to_defaults(conn: sqlite3.Connection, country: str, defaults:
         int(defaults["public_approval"]),
         str(defaults["ambition"]),
         country,
-    ))
-    cur.execute("DELETE FROM turn_history WHERE country = ?", (country,))
-    conn.commit()
+    )
 
 
-def reset_all_countries(conn: sqlite3.Connection, country_defs: Dict[str, Dict[str, Any]]) -> None:
-    for country, defs in country_defs.items():
-        reset_country_to_defaults(conn, country, defs)
+def reset_all_countries(conn: sqlite3.Connection, country_defs: Dict[str, Dict[str, Any]], *, commit: bool = True) -> None:
+    """Alle Länder in einem executemany zurücksetzen (ein Commit statt einem pro Land)."""
+    cur = conn.cursor()
+    cur.executemany(_COUNTRY_RESET_UPDATE, [_country_reset_params(c, d) for c, d in country_defs.items()])
+    cur.executemany("DELETE FROM turn_history WHERE country = ?", [(c,) for c in country_defs])
+    if commit:
+        conn.commit()
 
 
 # -----------------------
 # EU + META
 # -----------------------
-def get_eu_state(conn: sqlite3.Connection) -> Dict[str, Any]:
+@dataclass(slots=True)
+class EUState:
+    cohesion: int
+    global_context: str
+    threat_level: int
+    frontline_pressure: int
+    energy_pressure: int
+    migration_pressure: int
+    disinfo_pressure: int
+    trade_war_pressure: int
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Für Prompt-Templates und set_eu_state(**...)."""
+        return asdict(self)
+
+    def clamped(self) -> "EUState":
+        """Kopie mit allen Werten in 0..100 – genau das, was set_eu_state speichern würde."""
+        return EUState(
+            cohesion=clamp_int(int(self.cohesion), 0, 100),
+            global_context=str(self.global_context),
+            threat_level=clamp_int(int(self.threat_level), 0, 100),
+            frontline_pressure=clamp_int(int(self.frontline_pressure), 0, 100),
+            energy_pressure=clamp_int(int(self.energy_pressure), 0, 100),
+            migration_pressure=clamp_int(int(self.migration_pressure), 0, 100),
+            disinfo_pressure=clamp_int(int(self.disinfo_pressure), 0, 100),
+            trade_war_pressure=clamp_int(int(self.trade_war_pressure), 0, 100),
+        )
+
+
+def get_eu_state(conn: sqlite3.Connection) -> EUState:
     cur = conn.cursor()
     cur.execute("""
         SELECT cohesion, global_context,
@@ -310,16 +400,16 @@ def get_eu_state(conn: sqlite3.Connection) -> Dict[str, Any]:
     """)
     row = cur.fetchone()
     cohesion, global_context, threat, frontline, energy, migr, disinfo, trade = row
-    return {
-        "cohesion": int(cohesion),
-        "global_context": str(global_context),
-        "threat_level": int(threat),
-        "frontline_pressure": int(frontline),
-        "energy_pressure": int(energy),
-        "migration_pressure": int(migr),
-        "disinfo_pressure": int(disinfo),
-        "trade_war_pressure": int(trade),
-    }
+    return EUState(
+        cohesion=int(cohesion),
+        global_context=str(global_context),
+        threat_level=int(threat),
+        frontline_pressure=int(frontline),
+        energy_pressure=int(energy),
+        migration_pressure=int(migr),
+        disinfo_pressure=int(disinfo),
+        trade_war_pressure=int(trade),
+    )
 
 
 def set_eu_state(
@@ -333,6 +423,7 @@ def set_eu_state(
     migration_pressure: int,
     disinfo_pressure: int,
     trade_war_pressure: int,
+    commit: bool = True,
 ) -> None:
     cur = conn.cursor()
     cur.execute("""
@@ -356,42 +447,144 @@ def set_eu_state(
         clamp_int(int(disinfo_pressure), 0, 100),
         clamp_int(int(trade_war_pressure), 0, 100),
     ))
-    conn.commit()
+    if commit:
+        conn.commit()
 
 
 def get_game_meta(conn: sqlite3.Connection) -> Dict[str, Any]:
     cur = conn.cursor()
-    cur.execute("SELECT round, phase, winner_country, winner_round, winner_reason FROM game_meta WHERE id = 1")
-    r, p, wc, wr, wrea = cur.fetchone()
+    cur.execute("SELECT round, phase, winner_country, winner_round, winner_reason, data_version FROM game_meta WHERE id = 1")
+    r, p, wc, wr, wrea, dv = cur.fetchone()
     return {
         "round": int(r),
         "phase": str(p),
         "winner_country": (str(wc) if wc else None),
         "winner_round": (int(wr) if wr is not None else None),
         "winner_reason": (str(wrea) if wrea else None),
+        "data_version": int(dv),
+    }
+
+
+def get_meta_version(conn: sqlite3.Connection) -> int:
+    """data_version direkt aus der DB (ungecacht, unter Write-Lock -> nie aus einer offenen Transaktion)."""
+    with _WRITE_LOCK:
+        return get_game_meta(conn)["data_version"]
+
+
+def get_round_status(conn: sqlite3.Connection) -> Dict[str, Any]:
+    """
+    Meta + Locks der aktuellen Runde in einem SELECT (JSON-Aggregat für die Locks):
+    {"meta": get_game_meta-Dict, "locks": {country: {"foreign", "domestic"}}, "locked_count" (Außen+Innen)}.
+    """
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT m.round, m.phase, m.winner_country, m.winner_round, m.winner_reason, m.data_version,
+               (SELECT json_group_object(country, json_array(locked_foreign_slot, locked_domestic_slot))
+                  FROM policy_locks WHERE round = m.round),
+               (SELECT COUNT(*) FROM policy_locks WHERE round = m.round
+                  AND COALESCE(locked_foreign_slot, 0) <> 0 AND COALESCE(locked_domestic_slot, 0) <> 0)
+        FROM game_meta m WHERE m.id = 1
+    """)
+    r, p, wc, wr, wrea, dv, locks_json, locked_cnt = cur.fetchone()
+    locks: Dict[str, Dict[str, Optional[int]]] = {}
+    for country, (f, d) in json.loads(locks_json or "{}").items():
+        locks[str(country)] = {
+            "foreign": (int(f) if f is not None else None),
+            "domestic": (int(d) if d is not None else None),
+        }
+    return {
+        "meta": {
+            "round": int(r),
+            "phase": str(p),
+            "winner_country": (str(wc) if wc else None),
+            "winner_round": (int(wr) if wr is not None else None),
+            "winner_reason": (str(wrea) if wrea else None),
+            "data_version": int(dv),
+        },
+        "locks": locks,
+        "locked_count": int(locked_cnt),
     }
 
 
-def set_game_meta(conn: sqlite3.Connection, round_no: int, phase: str) -> None:
+def get_progress_watermark(conn: sqlite3.Connection) -> Tuple[int, str, int]:
+    """(round, phase, max turn_history id): ändert sich nur, wenn der GM das Spiel weiterbewegt."""
     cur = conn.cursor()
-    cur.execute("UPDATE game_meta SET round = ?, phase = ? WHERE id = 1", (int(round_no), str(phase)))
-    conn.commit()
+    cur.execute("""
+        SELECT m.round, m.phase, (SELECT COALESCE(MAX(id), 0) FROM turn_history)
+        FROM game_meta m WHERE m.id = 1
+    """)
+    r, p, h = cur.fetchone()
+    return (int(r), str(p), int(h))
+
+
+class StaleGameMetaError(RuntimeError):
+    """game_meta wurde seit dem Lesen von einer anderen Session geändert (data_version passt nicht mehr)."""
+
+
+def _check_meta_version(cur: sqlite3.Cursor, expected_version: Optional[int]) -> None:
+    if expected_version is not None and cur.rowcount == 0:
+        raise StaleGameMetaError(f"game_meta.data_version != {expected_version}")
 
 
-def set_game_over(conn: sqlite3.Connection, *, winner_country: str, winner_round: int, reason: str = "win_conditions") -> None:
+def claim_game_meta(conn: sqlite3.Connection, *, expected_version: int) -> int:
+    """
+    Optimistic Lock vor teuren GM-Aktionen (LLM-Calls): data_version nur hochzählen, wenn sie noch dem
+    gelesenen Stand entspricht. Gibt die neue Version zurück, sonst StaleGameMetaError.
+    """
+    with transaction(conn):
+        cur = conn.cursor()
+        cur.execute(
+            "UPDATE game_meta SET data_version = data_version + 1 WHERE id = 1 AND data_version = ?",
+            (int(expected_version),),
+        )
+        _check_meta_version(cur, expected_version)
+    return int(expected_version) + 1
+
+
+def set_game_meta(
+    conn: sqlite3.Connection,
+    round_no: int,
+    phase: str,
+    *,
+    expected_version: Optional[int] = None,
+    commit: bool = True,
+) -> None:
+    cur = conn.cursor()
+    cur.execute("""
+        UPDATE game_meta
+        SET round = ?, phase = ?, data_version = data_version + 1
+        WHERE id = 1 AND (? IS NULL OR data_version = ?)
+    """, (int(round_no), str(phase), expected_version, expected_version))
+    _check_meta_version(cur, expected_version)
+    if commit:
+        conn.commit()
+
+
+def set_game_over(
+    conn: sqlite3.Connection,
+    *,
+    winner_country: str,
+    winner_round: int,
+    reason: str = "win_conditions",
+    expected_version: Optional[int] = None,
+    commit: bool = True,
+) -> None:
     cur = conn.cursor()
     cur.execute("""
         UPDATE game_meta
         SET phase = 'game_over',
             winner_country = ?,
             winner_round = ?,
-            winner_reason = ?
-        WHERE id = 1
-    """, (str(winner_country), int(winner_round), str(reason)))
-    conn.commit()
+            winner_reason = ?,
+            data_version = data_version + 1
+        WHERE id = 1 AND (? IS NULL OR data_version = ?)
+    """, (str(winner_country), int(winner_round), str(reason), expected_version, expected_version))
+    _check_meta_version(cur, expected_version)
+    if commit:
+        conn.commit()
 
 
-def clear_game_over(conn: sqlite3.Connection) -> None:
+def clear_game_over(conn: sqlite3.Connection, *, commit: bool = True) -> None:
     cur = conn.cursor()
     cur.execute("""
         UPDATE game_meta
@@ -400,22 +593,17 @@ def clear_game_over(conn: sqlite3.Connection) -> None:
             winner_reason = NULL
         WHERE id = 1
     """)
-    conn.commit()
+    if commit:
+        conn.commit()
 
 
 # -----------------------
 # Countries CRUD
 # -----------------------
-def load_country_metrics(conn: sqlite3.Connection, country: str) -> Optional[Dict[str, Any]]:
-    cur = conn.cursor()
-    cur.execute("""
-        SELECT name, military, stability, economy, diplomatic_influence, public_approval, ambition
-        FROM countries
-        WHERE name = ?
-    """, (country,))
-    row = cur.fetchone()
-    if not row:
-        return None
+_COUNTRY_METRICS_COLS = "name, military, stability, economy, diplomatic_influence, public_approval, ambition"
+
+
+def _country_metrics_row(row) -> Dict[str, Any]:
     return {
         "name": row[0],
         "military": int(row[1]),
@@ -427,76 +615,116 @@ def load_country_metrics(conn: sqlite3.Connection, country: str) -> Optional[Dic
     }
 
 
+def load_country_metrics(conn: sqlite3.Connection, country: str) -> Optional[Dict[str, Any]]:
+    cur = conn.cursor()
+    cur.execute(f"""
+        SELECT {_COUNTRY_METRICS_COLS}
+        FROM countries
+        WHERE name = ?
+    """, (country,))
+    row = cur.fetchone()
+    if not row:
+        return None
+    return _country_metrics_row(row)
+
+
 def load_all_country_metrics(conn: sqlite3.Connection, countries: List[str]) -> Dict[str, Dict[str, Any]]:
-    out: Dict[str, Dict[str, Any]] = {}
-    for c in countries:
-        m = load_country_metrics(conn, c)
-        if m:
-            out[c] = m
-    return out
+    """Alle Länder in einem SELECT (statt N). Reihenfolge wie `countries`, fehlende Länder fehlen im Ergebnis."""
+    if not countries:
+        return {}
+    placeholders = ",".join("?" * len(countries))
+    cur = conn.cursor()
+    cur.execute(f"""
+        SELECT {_COUNTRY_METRICS_COLS}
+        FROM countries
+        WHERE name IN ({placeholders})
+    """, tuple(countries))
+    by_name = {row[0]: _country_metrics_row(row) for row in cur.fetchall()}
+    return {c: by_name[c] for c in countries if c in by_name}
 
 
-def apply_country_deltas(conn: sqlite3.Connection, country: str, deltas: Dict[str, Any]) -> None:
-    dm = int(deltas.get("militär", 0))
-    ds = int(deltas.get("stabilität", 0))
-    de = int(deltas.get("wirtschaft", 0))
-    dd = int(deltas.get("diplomatie", 0))
-    dp = int(deltas.get("öffentliche_zustimmung", 0))
+# LLM-Delta-Key -> Spalte in countries (Reihenfolge wie in _COUNTRY_DELTAS_UPDATE)
+_DELTA_COLUMNS = (
+    ("militär", "military"),
+    ("stabilität", "stability"),
+    ("wirtschaft", "economy"),
+    ("diplomatie", "diplomatic_influence"),
+    ("öffentliche_zustimmung", "public_approval"),
+)
+_DELTA_KEYS = tuple(key for key, _col in _DELTA_COLUMNS)
 
-    cur = conn.cursor()
-    cur.execute("""
-        UPDATE countries SET
-            military = military + ?,
-            stability = stability + ?,
-            economy = economy + ?,
-            diplomatic_influence = diplomatic_influence + ?,
-            public_approval = public_approval + ?
-        WHERE name = ?
-    """, (dm, ds, de, dd, dp, country))
-    conn.commit()
 
-    cur.execute("""
-        SELECT military, stability, economy, diplomatic_influence, public_approval
-        FROM countries WHERE name = ?
-    """, (country,))
-    m, s, e, d, p = cur.fetchone()
+def _delta_values(deltas: Dict[str, Any]) -> Tuple[int, ...]:
+    """LLM-Deltas -> 5 ints in Spaltenreihenfolge (fehlende Keys = 0)."""
+    get = deltas.get
+    return tuple(int(get(key, 0)) for key in _DELTA_KEYS)
 
-    cur.execute("""
-        UPDATE countries SET
-            military = ?, stability = ?, economy = ?, diplomatic_influence = ?, public_approval = ?
-        WHERE name = ?
-    """, (clamp_int(m), clamp_int(s), clamp_int(e), clamp_int(d), clamp_int(p), country))
-    conn.commit()
 
+_COUNTRY_DELTAS_UPDATE = """
+    UPDATE countries SET
+        military = MAX(0, MIN(100, military + ?)),
+        stability = MAX(0, MIN(100, stability + ?)),
+        economy = MAX(0, MIN(100, economy + ?)),
+        diplomatic_influence = MAX(0, MIN(100, diplomatic_influence + ?)),
+        public_approval = MAX(0, MIN(100, public_approval + ?))
+    WHERE name = ?
+"""
+
+
+def _country_delta_params(country: str, deltas: Dict[str, Any]) -> Tuple:
+    return (*_delta_values(deltas), country)
+
+
+def apply_country_deltas_many(conn: sqlite3.Connection, deltas_by_country: Dict[str, Dict[str, Any]]) -> None:
+    """
+    Deltas aller Länder addieren und in SQL auf [0, 100] clampen – ein executemany ohne Commit,
+    der Aufrufer klammert die ganze Runde in `with transaction(conn):`.
+    """
+    conn.executemany(
+        _COUNTRY_DELTAS_UPDATE,
+        [_country_delta_params(country, d) for country, d in deltas_by_country.items()],
+    )
+
+
+def country_metrics_after_deltas(metrics: Dict[str, Any], deltas: Dict[str, Any]) -> Dict[str, Any]:
+    """In-Memory-Gegenstück zu apply_country_deltas_many (gleicher Clamp) – spart den Re-Read nach dem UPDATE."""
+    out = dict(metrics)
+    for (_key, col), d in zip(_DELTA_COLUMNS, _delta_values(deltas)):
+        out[col] = clamp_int(int(out[col]) + d)
+    return out
+
+
+_TURN_HISTORY_INSERT = """
+    INSERT INTO turn_history (
+        country, round, action_public, global_context,
+        delta_military, delta_stability, delta_economy, delta_diplomatic_influence, delta_public_approval
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
 
-def insert_turn_history(
+
+def _turn_history_params(country: str, round_no: int, action_public: str, global_context: str, deltas: Dict[str, Any]) -> Tuple:
+    return (
+        country,
+        int(round_no),
+        str(action_public),
+        str(global_context),
+        *_delta_values(deltas),
+    )
+
+
+def insert_turn_history_many(
     conn: sqlite3.Connection,
     *,
-    country: str,
     round_no: int,
-    action_public: str,
     global_context: str,
-    deltas: Dict[str, Any],
+    actions_and_deltas: Dict[str, Tuple[str, Dict[str, Any]]],
 ) -> None:
-    cur = conn.cursor()
-    cur.execute("""
-        INSERT INTO turn_history (
-            country, round, action_public, global_context,
-            delta_military, delta_stability, delta_economy, delta_diplomatic_influence, delta_public_approval
-        )
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, (
-        country,
-        int(round_no),
-        str(action_public),
-        str(global_context),
-        int(deltas.get("militär", 0)),
-        int(deltas.get("stabilität", 0)),
-        int(deltas.get("wirtschaft", 0)),
-        int(deltas.get("diplomatie", 0)),
-        int(deltas.get("öffentliche_zustimmung", 0)),
-    ))
-    conn.commit()
+    """Alle Länder einer Runde: {country: (action_public, deltas)}. Ohne Commit (Aufrufer nutzt `with transaction(conn):`)."""
+    conn.executemany(_TURN_HISTORY_INSERT, [
+        _turn_history_params(country, round_no, action_public, global_context, deltas)
+        for country, (action_public, deltas) in actions_and_deltas.items()
+    ])
 
 
 def load_recent_history(conn: sqlite3.Connection, country: str, limit: int = 12) -> List[Tuple]:
@@ -513,36 +741,60 @@ def load_recent_history(conn: sqlite3.Connection, country: str, limit: int = 12)
     return cur.fetchall()
 
 
+def get_history_rounds(conn: sqlite3.Connection) -> List[int]:
+    """Alle Runden mit Historie (turn_history, external_events, domestic_events), neueste zuerst."""
+    cur = conn.cursor()
+    # UNION (nicht ALL): SQLite dedupliziert + sortiert, jede Teilabfrage läuft über einen round-Index
+    cur.execute("""
+        SELECT round FROM turn_history
+        UNION SELECT round FROM external_events
+        UNION SELECT round FROM domestic_events
+        ORDER BY round DESC
+    """)
+    return [int(r[0]) for r in cur.fetchall()]
+
+
+def get_turn_history_multi(conn: sqlite3.Connection, rounds: List[int]) -> Dict[int, List[Tuple[str, str, str]]]:
+    """{round: [(country, action_public, global_context), ...]} für mehrere Runden in einem Query."""
+    out: Dict[int, List[Tuple[str, str, str]]] = {int(r): [] for r in rounds}
+    if not out:
+        return out
+    cur = conn.cursor()
+    cur.execute(f"""
+        SELECT round, country, action_public, global_context
+        FROM turn_history
+        WHERE round IN ({",".join("?" * len(out))})
+        ORDER BY round DESC, country ASC
+    """, tuple(out))
+    for r, country, action_public, global_context in cur.fetchall():
+        out[int(r)].append((country, action_public, global_context))
+    return out
+
+
 # -----------------------
 # Snapshots for dashboard
 # -----------------------
-def upsert_country_snapshot(
-    conn: sqlite3.Connection,
-    *,
-    round_no: int,
-    country: str,
-    metrics: Dict[str, Any],
-    victory_progress: float,
-    is_winner: bool,
-) -> None:
-    cur = conn.cursor()
-    cur.execute("""
-        INSERT INTO country_snapshots (
-            round, country,
-            economy, stability, military, diplomatic_influence, public_approval,
-            victory_progress, is_winner
-        )
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ON CONFLICT(round, country) DO UPDATE SET
-            economy=excluded.economy,
-            stability=excluded.stability,
-            military=excluded.military,
-            diplomatic_influence=excluded.diplomatic_influence,
-            public_approval=excluded.public_approval,
-            victory_progress=excluded.victory_progress,
-            is_winner=excluded.is_winner,
-            ts=CURRENT_TIMESTAMP
-    """, (
+_SNAPSHOT_UPSERT = """
+    INSERT INTO country_snapshots (
+        round, country,
+        economy, stability, military, diplomatic_influence, public_approval,
+        victory_progress, is_winner
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(round, country) DO UPDATE SET
+        economy=excluded.economy,
+        stability=excluded.stability,
+        military=excluded.military,
+        diplomatic_influence=excluded.diplomatic_influence,
+        public_approval=excluded.public_approval,
+        victory_progress=excluded.victory_progress,
+        is_winner=excluded.is_winner,
+        ts=CURRENT_TIMESTAMP
+"""
+
+
+def _snapshot_params(round_no: int, country: str, metrics: Dict[str, Any], victory_progress: float, is_winner: bool) -> Tuple:
+    return (
         int(round_no),
         str(country),
         int(metrics["economy"]),
@@ -552,39 +804,80 @@ def upsert_country_snapshot(
         int(metrics["public_approval"]),
         float(victory_progress),
         1 if is_winner else 0,
-    ))
-    conn.commit()
+    )
+
+
+def upsert_country_snapshots_many(
+    conn: sqlite3.Connection,
+    *,
+    round_no: int,
+    rows: List[Tuple[str, Dict[str, Any], float, bool]],
+) -> None:
+    """rows = [(country, metrics, victory_progress, is_winner), ...]. Ohne Commit (Aufrufer nutzt `with transaction(conn):`)."""
+    conn.executemany(_SNAPSHOT_UPSERT, [
+        _snapshot_params(round_no, country, metrics, progress, is_winner)
+        for country, metrics, progress, is_winner in rows
+    ])
+
+
+_SNAPSHOT_COLS = "round, country, economy, stability, military, diplomatic_influence, public_approval, victory_progress, is_winner, ts"
+
+
+def _snapshot_row(r) -> Dict[str, Any]:
+    return {
+        "round": int(r[0]),
+        "country": str(r[1]),
+        "economy": int(r[2]),
+        "stability": int(r[3]),
+        "military": int(r[4]),
+        "diplomatic_influence": int(r[5]),
+        "public_approval": int(r[6]),
+        "victory_progress": float(r[7]),
+        "is_winner": bool(int(r[8])),
+        "ts": str(r[9]),
+    }
 
 
 def get_country_snapshots(conn: sqlite3.Connection, *, limit_rounds: int = 50) -> List[Dict[str, Any]]:
     cur = conn.cursor()
-    cur.execute("""
-        SELECT round, country, economy, stability, military, diplomatic_influence, public_approval, victory_progress, is_winner, ts
+    cur.execute(f"""
+        SELECT {_SNAPSHOT_COLS}
         FROM country_snapshots
         ORDER BY round ASC, country ASC
     """)
-    rows = cur.fetchall()
-    out: List[Dict[str, Any]] = []
-    for r in rows:
-        out.append({
-            "round": int(r[0]),
-            "country": str(r[1]),
-            "economy": int(r[2]),
-            "stability": int(r[3]),
-            "military": int(r[4]),
-            "diplomatic_influence": int(r[5]),
-            "public_approval": int(r[6]),
-            "victory_progress": float(r[7]),
-            "is_winner": bool(int(r[8])),
-            "ts": str(r[9]),
-        })
-    return out
+    return [_snapshot_row(r) for r in cur.fetchall()]
+
+
+def get_country_snapshots_since(conn: sqlite3.Connection, round_no: int) -> List[Dict[str, Any]]:
+    """Snapshots ab (inkl.) round_no – für inkrementelles Nachladen im Dashboard."""
+    cur = conn.cursor()
+    cur.execute(f"""
+        SELECT {_SNAPSHOT_COLS}
+        FROM country_snapshots
+        WHERE round >= ?
+        ORDER BY round ASC, country ASC
+    """, (int(round_no),))
+    return [_snapshot_row(r) for r in cur.fetchall()]
+
+
+def get_latest_snapshot_leaderboard(conn: sqlite3.Connection) -> List[Dict[str, Any]]:
+    """Jüngster Snapshot je Land, bereits nach (victory_progress, public_approval) absteigend sortiert."""
+    cur = conn.cursor()
+    cur.execute(f"""
+        SELECT {_SNAPSHOT_COLS}
+        FROM country_snapshots
+        WHERE (country, round) IN (
+            SELECT country, MAX(round) FROM country_snapshots GROUP BY country
+        )
+        ORDER BY victory_progress DESC, public_approval DESC, country ASC
+    """)
+    return [_snapshot_row(r) for r in cur.fetchall()]
 
 
 # -----------------------
 # Round Actions + Locks (legacy)
 # -----------------------
-def clear_round_data(conn: sqlite3.Connection, round_no: int) -> None:
+def clear_round_data(conn: sqlite3.Connection, round_no: int, *, commit: bool = True) -> None:
     cur = conn.cursor()
     # legacy tables
     cur.execute("DELETE FROM round_actions WHERE round = ?", (int(round_no),))
@@ -592,27 +885,8 @@ def clear_round_data(conn: sqlite3.Connection, round_no: int) -> None:
     # new tables
     cur.execute("DELETE FROM policy_candidates WHERE round = ?", (int(round_no),))
     cur.execute("DELETE FROM policy_locks WHERE round = ?", (int(round_no),))
-    conn.commit()
-
-
-def upsert_round_actions(conn: sqlite3.Connection, round_no: int, country: str, actions_obj: Dict[str, Any]) -> None:
-    """
-    Save action_text per variant + impact_json (folgen).
-    """
-    cur = conn.cursor()
-    for variant in ("aggressiv", "moderate", "passiv"):
-        text = str(actions_obj[variant]["aktion"])
-        folgen = actions_obj[variant].get("folgen", {}) or {}
-        impact_json = json.dumps(folgen, ensure_ascii=False)
-
-        cur.execute("""
-            INSERT INTO round_actions (round, country, variant, action_text, impact_json)
-            VALUES (?, ?, ?, ?, ?)
-            ON CONFLICT(round, country, variant) DO UPDATE SET
-                action_text = excluded.action_text,
-                impact_json = excluded.impact_json
-        """, (int(round_no), country, variant, text, impact_json))
-    conn.commit()
+    if commit:
+        conn.commit()
 
 
 def get_round_actions(conn: sqlite3.Connection, round_no: int) -> Dict[str, Dict[str, str]]:
@@ -695,7 +969,7 @@ def upsert_policy_candidate(
     if slot_i < 1 or slot_i > 3:
         raise ValueError("slot must be 1..3")
 
-    impact_json = json.dumps(impact or {}, ensure_ascii=False)
+    impact_json = json.dumps(impact or {}, ensure_ascii=False, separators=(",", ":"))
 
     cur = conn.cursor()
     cur.execute("""
@@ -820,26 +1094,44 @@ def get_policy_locks(conn: sqlite3.Connection, *, round_no: int) -> Dict[str, Di
     return out
 
 
-def all_policies_locked(conn: sqlite3.Connection, *, round_no: int, countries: List[str]) -> bool:
-    locks = get_policy_locks(conn, round_no=round_no)
-    for c in countries:
-        v = locks.get(c) or {}
-        if not v.get("foreign") or not v.get("domestic"):
-            return False
-    return True
+def get_locked_policy_texts(conn: sqlite3.Connection, *, round_no: int) -> Dict[str, Dict[str, Tuple[int, str]]]:
+    """
+    {country: {"foreign": (slot, action_text), "domestic": (slot, action_text)}} für alle Locks einer Runde –
+    ein JOIN statt get_policy_candidates pro Land und Domain. Fehlender Lock/Kandidat -> (0, "") bzw. (slot, "").
+    """
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT l.country,
+               l.locked_foreign_slot, f.action_text,
+               l.locked_domestic_slot, d.action_text
+        FROM policy_locks l
+        LEFT JOIN policy_candidates f
+          ON f.round = l.round AND f.country = l.country AND f.domain = 'foreign' AND f.slot = l.locked_foreign_slot
+        LEFT JOIN policy_candidates d
+          ON d.round = l.round AND d.country = l.country AND d.domain = 'domestic' AND d.slot = l.locked_domestic_slot
+        WHERE l.round = ?
+    """, (int(round_no),))
+    return {
+        str(country): {
+            "foreign": (int(f_slot or 0), str(f_text or "")),
+            "domestic": (int(d_slot or 0), str(d_text or "")),
+        }
+        for country, f_slot, f_text, d_slot, d_text in cur.fetchall()
+    }
 
 
 # -----------------------
 # Round Summaries (Memory)
 # -----------------------
-def upsert_round_summary(conn: sqlite3.Connection, round_no: int, summary: str) -> None:
+def upsert_round_summary(conn: sqlite3.Connection, round_no: int, summary: str, *, commit: bool = True) -> None:
     cur = conn.cursor()
     cur.execute("""
         INSERT INTO round_summaries (round, summary)
         VALUES (?, ?)
         ON CONFLICT(round) DO UPDATE SET summary = excluded.summary, ts = CURRENT_TIMESTAMP
     """, (int(round_no), str(summary)))
-    conn.commit()
+    if commit:
+        conn.commit()
 
 
 def get_recent_round_summaries(conn: sqlite3.Connection, limit: int = 3) -> List[Tuple[int, str]]:
@@ -853,49 +1145,61 @@ def get_recent_round_summaries(conn: sqlite3.Connection, limit: int = 3) -> List
     return [(int(r), str(s)) for r, s in cur.fetchall()]
 
 
-def clear_all_round_summaries(conn: sqlite3.Connection) -> None:
+def clear_all_round_summaries(conn: sqlite3.Connection, *, commit: bool = True) -> None:
     cur = conn.cursor()
     cur.execute("DELETE FROM round_summaries")
-    conn.commit()
+    if commit:
+        conn.commit()
 
 
 # -----------------------
 # External events (USA/China/Russia)
 # -----------------------
-def clear_external_events(conn: sqlite3.Connection, round_no: int) -> None:
-    cur = conn.cursor()
-    cur.execute("DELETE FROM external_events WHERE round = ?", (int(round_no),))
-    conn.commit()
-
-
-def upsert_external_event(
-    conn: sqlite3.Connection,
-    round_no: int,
-    actor: str,
-    headline: str,
-    modifiers: Dict[str, Any],
-    *,
-    quote: str = "",
-    craziness: int = 0,
-) -> None:
-    cur = conn.cursor()
-    cur.execute("""
-        INSERT INTO external_events (round, actor, headline, modifiers_json, quote, craziness)
-        VALUES (?, ?, ?, ?, ?, ?)
-        ON CONFLICT(round, actor) DO UPDATE SET
-            headline = excluded.headline,
-            modifiers_json = excluded.modifiers_json,
-            quote = excluded.quote,
-            craziness = excluded.craziness
-    """, (
+_EXTERNAL_EVENT_UPSERT = """
+    INSERT INTO external_events (round, actor, headline, modifiers_json, quote, craziness)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT(round, actor) DO UPDATE SET
+        headline = excluded.headline,
+        modifiers_json = excluded.modifiers_json,
+        quote = excluded.quote,
+        craziness = excluded.craziness
+"""
+
+
+def _external_event_params(round_no, actor, headline, modifiers, quote, craziness) -> Tuple[Any, ...]:
+    return (
         int(round_no),
         str(actor),
         str(headline),
-        json.dumps(modifiers, ensure_ascii=False),
+        json.dumps(modifiers, ensure_ascii=False, separators=(",", ":")),
         str(quote),
         int(craziness),
-    ))
-    conn.commit()
+    )
+
+
+def upsert_external_events_many(conn: sqlite3.Connection, round_no: int, moves: List[Dict[str, Any]]) -> None:
+    """Moves ({"actor", "headline", "modifiers", "quote", "craziness"}) in einem executemany. Ohne Commit."""
+    conn.executemany(_EXTERNAL_EVENT_UPSERT, [
+        _external_event_params(
+            round_no, m.get("actor", ""), m.get("headline", ""), m.get("modifiers", {}) or {},
+            m.get("quote", ""), int(m.get("craziness", 0) or 0),
+        )
+        for m in moves
+    ])
+
+
+def _external_event_row(actor, headline, mj, quote, craziness) -> Dict[str, Any]:
+    try:
+        modifiers = json.loads(mj)
+    except Exception:
+        modifiers = {}
+    return {
+        "actor": str(actor),
+        "headline": str(headline),
+        "modifiers": modifiers,
+        "quote": str(quote or ""),
+        "craziness": int(craziness or 0),
+    }
 
 
 def get_external_events(conn: sqlite3.Connection, round_no: int) -> List[Dict[str, Any]]:
@@ -906,51 +1210,54 @@ def get_external_events(conn: sqlite3.Connection, round_no: int) -> List[Dict[st
         WHERE round = ?
         ORDER BY actor ASC
     """, (int(round_no),))
-    out: List[Dict[str, Any]] = []
-    for actor, headline, mj, quote, craziness in cur.fetchall():
-        try:
-            modifiers = json.loads(mj)
-        except Exception:
-            modifiers = {}
-        out.append({
-            "actor": str(actor),
-            "headline": str(headline),
-            "modifiers": modifiers,
-            "quote": str(quote or ""),
-            "craziness": int(craziness or 0),
-        })
+    return [_external_event_row(*r) for r in cur.fetchall()]
+
+
+def get_external_events_multi(conn: sqlite3.Connection, rounds: List[int]) -> Dict[int, List[Dict[str, Any]]]:
+    """Mehrere Runden in einem Query (Historie) -> {round: [event, ...]}."""
+    out: Dict[int, List[Dict[str, Any]]] = {int(r): [] for r in rounds}
+    if not out:
+        return out
+    cur = conn.cursor()
+    cur.execute(f"""
+        SELECT round, actor, headline, modifiers_json, quote, craziness
+        FROM external_events
+        WHERE round IN ({",".join("?" * len(out))})
+        ORDER BY round DESC, actor ASC
+    """, tuple(out))
+    for r, *rest in cur.fetchall():
+        out[int(r)].append(_external_event_row(*rest))
     return out
 
 
 # -----------------------
 # Domestic events
 # -----------------------
-def clear_domestic_events(conn: sqlite3.Connection, round_no: int) -> None:
-    cur = conn.cursor()
-    cur.execute("DELETE FROM domestic_events WHERE round = ?", (int(round_no),))
-    conn.commit()
+def clear_round_events(conn: sqlite3.Connection, round_no: int, *, commit: bool = True) -> None:
+    """External + domestic events einer Runde in einer Transaktion löschen (ein Commit statt zwei)."""
+    conn.execute("DELETE FROM external_events WHERE round = ?", (int(round_no),))
+    conn.execute("DELETE FROM domestic_events WHERE round = ?", (int(round_no),))
+    if commit:
+        conn.commit()
 
 
-def upsert_domestic_event(
-    conn: sqlite3.Connection,
-    round_no: int,
-    country: str,
-    headline: str,
-    *,
-    details: str = "",
-    craziness: int = 0,
-) -> None:
-    cur = conn.cursor()
-    cur.execute("""
-        INSERT INTO domestic_events (round, country, headline, details, craziness, created_at)
-        VALUES (?, ?, ?, ?, ?, strftime('%s','now'))
-        ON CONFLICT(round, country) DO UPDATE SET
-            headline = excluded.headline,
-            details = excluded.details,
-            craziness = excluded.craziness,
-            created_at = strftime('%s','now')
-    """, (int(round_no), str(country), str(headline), str(details), int(craziness)))
-    conn.commit()
+_DOMESTIC_EVENT_UPSERT = """
+    INSERT INTO domestic_events (round, country, headline, details, craziness, created_at)
+    VALUES (?, ?, ?, ?, ?, strftime('%s','now'))
+    ON CONFLICT(round, country) DO UPDATE SET
+        headline = excluded.headline,
+        details = excluded.details,
+        craziness = excluded.craziness,
+        created_at = strftime('%s','now')
+"""
+
+
+def upsert_domestic_events_many(conn: sqlite3.Connection, round_no: int, events: Dict[str, Dict[str, Any]]) -> None:
+    """{country: {"headline", "details", "craziness"}} in einem executemany. Ohne Commit (Aufrufer nutzt `with transaction(conn):`)."""
+    conn.executemany(_DOMESTIC_EVENT_UPSERT, [
+        (int(round_no), str(c), str(e.get("headline", "")), str(e.get("details", "")), int(e.get("craziness", 0) or 0))
+        for c, e in events.items()
+    ])
 
 
 def get_domestic_events(conn: sqlite3.Connection, round_no: int) -> List[Dict[str, Any]]:
@@ -1059,13 +1366,29 @@ def get_max_snapshot_round(conn: sqlite3.Connection) -> Optional[int]:
     return int(r) if r is not None else None
 
 
-def clear_country_snapshots(conn: sqlite3.Connection) -> None:
+def get_snapshot_marker(conn: sqlite3.Connection) -> Tuple[Optional[int], Optional[str]]:
+    """
+    (höchste Runde, ts der ersten Snapshot-Zeile). Die erste Zeile (Baseline) entsteht einmal pro Spiel –
+    ändert sich ihr ts, wurde zwischendurch resettet, auch wenn das neue Spiel schon weiter ist als das alte.
+    """
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT MAX(round),
+               (SELECT ts FROM country_snapshots ORDER BY round ASC, country ASC LIMIT 1)
+        FROM country_snapshots
+    """)
+    r, first_ts = cur.fetchone()
+    return (int(r) if r is not None else None, str(first_ts) if first_ts is not None else None)
+
+
+def clear_country_snapshots(conn: sqlite3.Connection, *, commit: bool = True) -> None:
     cur = conn.cursor()
     cur.execute("DELETE FROM country_snapshots")
-    conn.commit()
+    if commit:
+        conn.commit()
 
 
-def clear_all_events_and_history(conn: sqlite3.Connection) -> None:
+def clear_all_events_and_history(conn: sqlite3.Connection, *, commit: bool = True) -> None:
     cur = conn.cursor()
     cur.execute("DELETE FROM turn_history")
     cur.execute("DELETE FROM external_events")
@@ -1074,4 +1397,5 @@ def clear_all_events_and_history(conn: sqlite3.Connection) -> None:
     cur.execute("DELETE FROM round_locks")
     cur.execute("DELETE FROM policy_candidates")
     cur.execute("DELETE FROM policy_locks")
-    conn.commit()
+    if commit:
+        conn.commit()
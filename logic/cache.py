@@ -0,0 +1,104 @@
+import sqlite3
+from typing import Dict, Any, List, Optional, Tuple
+
+import streamlit as st
+
+from db import (
+    EUState,
+    committed_version,
+    get_game_meta,
+    get_eu_state,
+    get_policy_locks,
+    get_round_status,
+    get_external_events,
+    get_domestic_events,
+    get_latest_snapshot_leaderboard,
+    load_country_metrics,
+    load_recent_history,
+    get_recent_round_summaries,
+    get_policy_candidates,
+    get_history_rounds,
+    get_external_events_multi,
+    get_turn_history_multi,
+)
+
+
+def db_version(conn: sqlite3.Connection) -> Tuple[int, int, int, int]:
+    """
+    Commit-Watermark der (prozessweit geteilten) Connection, siehe db.committed_version.
+    total_changes allein reicht nicht: es zählt uncommittete Statements mit und fällt bei Rollback nicht zurück.
+    """
+    return committed_version(conn)
+
+
+# Leading underscore: st.cache_data hasht die Connection nicht, Key ist nur (version, ...).
+@st.cache_data(show_spinner=False, max_entries=64)
+def cached_game_meta(_conn: sqlite3.Connection, version: Tuple[int, int, int, int]) -> Dict[str, Any]:
+    return get_game_meta(_conn)
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def cached_eu_state(_conn: sqlite3.Connection, version: Tuple[int, int, int, int]) -> EUState:
+    return get_eu_state(_conn)
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def cached_policy_locks(
+    _conn: sqlite3.Connection, version: Tuple[int, int, int, int], round_no: int
+) -> Dict[str, Dict[str, Optional[int]]]:
+    return get_policy_locks(_conn, round_no=round_no)
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def cached_round_status(_conn: sqlite3.Connection, version: Tuple[int, int, int, int]) -> Dict[str, Any]:
+    """Sidebar + GM-Panel teilen sich einen Read: Meta, Locks und Event-Zähler der aktuellen Runde."""
+    return get_round_status(_conn)
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def cached_external_events(_conn: sqlite3.Connection, version: Tuple[int, int, int, int], round_no: int) -> List[Dict[str, Any]]:
+    return get_external_events(_conn, round_no)
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def cached_domestic_events(_conn: sqlite3.Connection, version: Tuple[int, int, int, int], round_no: int) -> List[Dict[str, Any]]:
+    return get_domestic_events(_conn, round_no)
+
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def cached_snapshot_leaderboard(_conn: sqlite3.Connection, version: Tuple[int, int, int, int]) -> List[Dict[str, Any]]:
+    return get_latest_snapshot_leaderboard(_conn)
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def cached_country_metrics(_conn: sqlite3.Connection, version: Tuple[int, int, int, int], country: str) -> Optional[Dict[str, Any]]:
+    return load_country_metrics(_conn, country)
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def cached_recent_history(_conn: sqlite3.Connection, version: Tuple[int, int, int, int], country: str, limit: int = 12) -> List[Tuple]:
+    return load_recent_history(_conn, country, limit=limit)
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def cached_recent_summaries(_conn: sqlite3.Connection, version: Tuple[int, int, int, int], limit: int = 3) -> List[Tuple[int, str]]:
+    return get_recent_round_summaries(_conn, limit=limit)
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def cached_policy_candidates(
+    _conn: sqlite3.Connection, version: Tuple[int, int, int, int], round_no: int, country: str, domain: str
+) -> List[Dict[str, Any]]:
+    return get_policy_candidates(_conn, round_no=round_no, country=country, domain=domain)
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def cached_round_history(_conn: sqlite3.Connection, version: Tuple[int, int, int, int]) -> Dict[str, Any]:
+    """Runden-Historie komplett (Runden, Außenmächte je Runde, Länderaktionen je Runde)."""
+    rounds = get_history_rounds(_conn)
+    return {
+        "rounds": rounds,
+        "external": get_external_events_multi(_conn, rounds),
+        "actions": get_turn_history_multi(_conn, rounds),
+    }
@@ -1,34 +1,46 @@
 import random
+from dataclasses import replace
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, List, Callable
 
 import streamlit as st
 
 from db import (
+    transaction,
+    get_locked_policy_texts,
     get_external_events,
     get_domestic_events,
-    get_recent_round_summaries,
     get_eu_state,
     set_eu_state,
-    clear_external_events,
-    upsert_external_event,
-    clear_domestic_events,
-    upsert_domestic_event,
+    clear_round_events,
+    upsert_external_events_many,
+    upsert_domestic_events_many,
     set_game_meta,
-    get_policy_locks,
-    get_policy_candidates,
-    all_policies_locked,
     load_all_country_metrics,
-    apply_country_deltas,
-    insert_turn_history,
+    apply_country_deltas_many,
+    country_metrics_after_deltas,
+    insert_turn_history_many,
     upsert_round_summary,
-    upsert_country_snapshot,
+    upsert_country_snapshots_many,
     get_max_snapshot_round,
     clear_round_data,
     set_game_over,
+    claim_game_meta,
+    get_meta_version,
+    StaleGameMetaError,
 )
 
-from ai_external import generate_external_moves, generate_domestic_events
-from ai_round import resolve_round_all_countries, generate_round_summary
+from logic.cache import (
+    db_version,
+    cached_eu_state,
+    cached_external_events,
+    cached_domestic_events,
+    cached_round_status,
+    cached_recent_summaries,
+)
+
+# ai_external/ai_round (Mistral-SDK) werden erst in den Button-Handlern importiert:
+# normale Reruns und Spieler-Sessions brauchen sie nie.
 
 
 def _auto_modifiers_from_craziness(actor: str, craziness: int) -> Dict[str, int]:
@@ -71,6 +83,45 @@ def _auto_modifiers_from_craziness(actor: str, craziness: int) -> Dict[str, int]
     }
 
 
+_CRAZY_ACTORS = ("USA", "Russia", "China")
+
+
+def _crazy_slider_defaults(
+    round_no: int,
+    ranges: Dict[str, Any],
+    ext_now: List[Dict[str, Any]],
+) -> Dict[str, int]:
+    """
+    Slider-Defaults je Außenmacht: gespeicherte Craziness der Runde, sonst ein Zufallswert aus der Baseline-Range.
+    Gezogen wird einmal pro Runde und Session (statt 2× randint pro Akteur bei jedem Rerun).
+    """
+    key = f"gm_crazy_defaults_{round_no}"
+    if key not in st.session_state:
+        st.session_state[key] = {a: random.randint(*ranges[a]) for a in _CRAZY_ACTORS}
+    drawn = st.session_state[key]
+    from_db = {x["actor"]: x["craziness"] for x in ext_now}
+    return {a: int(from_db.get(a) or drawn[a]) for a in _CRAZY_ACTORS}
+
+
+def _claim_or_rerun(conn, seen_version: int) -> int:
+    """
+    Optimistic Lock vor LLM-Calls: zweiter GM-Tab (oder veralteter Stand) bekommt einen Hinweis statt
+    doppelt generierter Runde. Gibt die neue data_version zurück, mit der am Ende geschrieben wird.
+    """
+    try:
+        claimed = claim_game_meta(conn, expected_version=seen_version)
+    except StaleGameMetaError:
+        _stale_rerun()
+    # Eigener Claim ist kein fremder Stand: scheitert danach der LLM-Call, darf der nächste Klick nicht "stale" sein
+    st.session_state["_gm_seen_meta_version"] = claimed
+    return claimed
+
+
+def _stale_rerun() -> None:
+    st.toast("⚠️ Spielstand wurde inzwischen geändert (anderer GM-Tab?) – Ansicht aktualisiert.")
+    st.rerun()
+
+
 def _render_external_preview(ext_events: List[Dict[str, Any]]) -> None:
     if not ext_events:
         st.caption("Noch keine Außenmächte-Moves generiert.")
@@ -103,7 +154,7 @@ def _render_domestic_preview(dom_events: List[Dict[str, Any]], countries_display
 
     for e in dom_events:
         c = e.get("country", "")
-        name = countries_display.get(c, c)
+        name = countries_display[c]
         headline = e.get("headline", "")
         details = (e.get("details") or "").strip()
         craziness = int(e.get("craziness", 0) or 0)
@@ -142,9 +193,16 @@ def render_gm_controls(
             st.warning("Game Over – nur Reset möglich.")
             st.stop()
 
-        eu_before = get_eu_state(conn)
-        ext_now = get_external_events(conn, round_no)
-        dom_now = get_domestic_events(conn, round_no)
+        # data_version, die der GM beim letzten Rendern gesehen hat: Button-Klicks schreiben nur gegen diesen Stand.
+        # Ungecacht gelesen -> der Claim basiert nie auf einem gecachten (ggf. zurückgerollten) Stand.
+        meta_version = get_meta_version(conn)
+        seen_version = st.session_state.get("_gm_seen_meta_version", meta_version)
+        st.session_state["_gm_seen_meta_version"] = meta_version
+
+        # Panel-Reads laufen bei jedem Rerun -> gecacht pro DB-Stand; Button-Handler lesen weiter direkt
+        eu_before = cached_eu_state(conn, db_version(conn))
+        ext_now = cached_external_events(conn, db_version(conn), round_no)
+        dom_now = cached_domestic_events(conn, db_version(conn), round_no)
 
         have_external = len(ext_now) == 3
         have_domestic = len(dom_now) == len(countries)
@@ -159,30 +217,28 @@ def render_gm_controls(
         # ---------------------
         st.markdown("#### 1) GM: KI generiert Außenmächte + Innenpolitik (nur Craziness einstellen)")
 
-        usa_min, usa_max = external_crazy_baseline_ranges["USA"]
-        rus_min, rus_max = external_crazy_baseline_ranges["Russia"]
-        chi_min, chi_max = external_crazy_baseline_ranges["China"]
+        crazy_defaults = _crazy_slider_defaults(round_no, external_crazy_baseline_ranges, ext_now)
 
         col1, col2 = st.columns(2)
         with col1:
             usa_c = st.slider(
                 "Craziness USA",
                 0, 100,
-                int(ext_now and next((x["craziness"] for x in ext_now if x["actor"] == "USA"), random.randint(usa_min, usa_max)) or random.randint(usa_min, usa_max)),
+                crazy_defaults["USA"],
                 disabled=inputs_disabled,
                 key=f"gm_crazy_usa_{round_no}",
             )
             rus_c = st.slider(
                 "Craziness Russia",
                 0, 100,
-                int(ext_now and next((x["craziness"] for x in ext_now if x["actor"] == "Russia"), random.randint(rus_min, rus_max)) or random.randint(rus_min, rus_max)),
+                crazy_defaults["Russia"],
                 disabled=inputs_disabled,
                 key=f"gm_crazy_rus_{round_no}",
             )
             chi_c = st.slider(
                 "Craziness China",
                 0, 100,
-                int(ext_now and next((x["craziness"] for x in ext_now if x["actor"] == "China"), random.randint(chi_min, chi_max)) or random.randint(chi_min, chi_max)),
+                crazy_defaults["China"],
                 disabled=inputs_disabled,
                 key=f"gm_crazy_chi_{round_no}",
             )
@@ -200,95 +256,89 @@ def render_gm_controls(
 
         gen_disabled = inputs_disabled or (not api_key)
         if st.button("🤖 Jetzt generieren (KI)", disabled=gen_disabled, use_container_width=True, key=f"gm_gen_all_{round_no}"):
+            from ai_external import generate_external_moves, generate_domestic_events
+
+            claimed_version = _claim_or_rerun(conn, seen_version)
             with st.spinner("KI generiert Außenmächte und Innenpolitik..."):
-                recent_summaries = get_recent_round_summaries(conn, limit=3)
+                recent_summaries = cached_recent_summaries(conn, db_version(conn), 3)
 
-                # --- External moves ---
                 craziness_by_actor = {"USA": int(usa_c), "Russia": int(rus_c), "China": int(chi_c)}
-                moves_obj = generate_external_moves(
-                    api_key=api_key,
-                    model="mistral-small",
-                    round_no=round_no,
-                    eu_state=eu_before,
-                    recent_round_summaries=recent_summaries,
-                    craziness_by_actor=craziness_by_actor,
-                    temperature=0.8,
-                    top_p=0.95,
-                    max_tokens=1200,
-                )
-
-                # Write external events (but override/ensure modifiers from craziness for transparency & consistency)
-                clear_external_events(conn, round_no)
-                moves_clean = []
-                for m in moves_obj.get("moves", []) or []:
-                    actor = m.get("actor", "")
-                    cz = int(m.get("craziness", craziness_by_actor.get(actor, 50)) or 0)
-                    mods = _auto_modifiers_from_craziness(actor, cz)
-                    moves_clean.append({
-                        "actor": actor,
-                        "headline": m.get("headline", ""),
-                        "quote": m.get("quote", ""),
-                        "craziness": cz,
-                        "modifiers": mods,
-                    })
-                    upsert_external_event(
-                        conn,
-                        round_no,
-                        actor=actor,
-                        headline=m.get("headline", ""),
-                        modifiers=mods,
-                        quote=m.get("quote", ""),
-                        craziness=cz,
-                    )
-
-                # Apply external modifiers to EU state (preview will show before/after)
-                global_context = str(moves_obj.get("global_context", eu_before.get("global_context", "")) or "")
-                eu_after = apply_external_modifiers_to_eu(eu_before, {"moves": moves_clean, "global_context": global_context})
-                set_eu_state(
-                    conn,
-                    cohesion=eu_after["cohesion"],
-                    global_context=eu_after["global_context"],
-                    threat_level=eu_after["threat_level"],
-                    frontline_pressure=eu_after["frontline_pressure"],
-                    energy_pressure=eu_after["energy_pressure"],
-                    migration_pressure=eu_after["migration_pressure"],
-                    disinfo_pressure=eu_after["disinfo_pressure"],
-                    trade_war_pressure=eu_after["trade_war_pressure"],
-                )
-
-                # --- Domestic events ---
-                clear_domestic_events(conn, round_no)
                 all_metrics = load_all_country_metrics(conn, countries)
 
+                # Druckwerte hängen nur an den (erzwungenen) Craziness-Werten -> vorab berechenbar,
+                # damit Außenmächte und Innenpolitik parallel generiert werden können (beide I/O-bound).
+                eu_for_domestic = apply_external_modifiers_to_eu(
+                    eu_before,
+                    {"moves": [{"modifiers": _auto_modifiers_from_craziness(a, cz)} for a, cz in craziness_by_actor.items()]},
+                ).clamped()
+
                 # optional: pass baseline via temperature influence; simplest: tweak temperature a bit
                 temp_dom = 0.75 + (float(dom_baseline) / 100.0) * 0.25  # 0.75..1.0
 
-                dom_obj = generate_domestic_events(
-                    api_key=api_key,
-                    model="mistral-small",
-                    round_no=round_no,
-                    eu_state=get_eu_state(conn),
-                    countries=countries,
-                    countries_metrics=all_metrics,
-                    recent_round_summaries=recent_summaries,
-                    recent_actions_by_country={},  # keep simple; not needed for GM
-                    temperature=temp_dom,
-                    top_p=0.95,
-                    max_tokens=1400,
-                )
-
-                for c in countries:
-                    e = (dom_obj.get("events", {}) or {}).get(c, {}) or {}
-                    upsert_domestic_event(
-                        conn,
-                        round_no,
-                        c,
-                        e.get("headline", ""),
-                        details=e.get("details", ""),
-                        craziness=int(e.get("craziness", 0) or 0),
+                with ThreadPoolExecutor(max_workers=2) as ex:
+                    moves_future = ex.submit(
+                        generate_external_moves,
+                        api_key=api_key,
+                        model="mistral-small",
+                        round_no=round_no,
+                        eu_state=eu_before.as_dict(),
+                        recent_round_summaries=recent_summaries,
+                        craziness_by_actor=craziness_by_actor,
+                        temperature=0.8,
+                        top_p=0.95,
+                        max_tokens=1200,
                     )
-
-                set_game_meta(conn, round_no, "external_generated")
+                    dom_future = ex.submit(
+                        generate_domestic_events,
+                        api_key=api_key,
+                        model="mistral-small",
+                        round_no=round_no,
+                        eu_state=eu_for_domestic.as_dict(),
+                        countries=countries,
+                        countries_metrics=all_metrics,
+                        recent_round_summaries=recent_summaries,
+                        recent_actions_by_country={},  # keep simple; not needed for GM
+                        temperature=temp_dom,
+                        top_p=0.95,
+                        max_tokens=1400,
+                    )
+                    moves_obj = moves_future.result()
+                    dom_obj = dom_future.result()
+
+                # Alle Writes der Generierung in einer Transaktion (ein Commit statt 3 + N + 3)
+                try:
+                    with transaction(conn):
+                        # Alte Events dieser Runde (extern + innen) in einem Rutsch löschen
+                        clear_round_events(conn, round_no, commit=False)
+
+                        # Write external events (but override/ensure modifiers from craziness for transparency & consistency)
+                        moves_clean = []
+                        for m in moves_obj.get("moves", []) or []:
+                            actor = m.get("actor", "")
+                            cz = int(m.get("craziness", craziness_by_actor.get(actor, 50)) or 0)
+                            mods = _auto_modifiers_from_craziness(actor, cz)
+                            moves_clean.append({
+                                "actor": actor,
+                                "headline": m.get("headline", ""),
+                                "quote": m.get("quote", ""),
+                                "craziness": cz,
+                                "modifiers": mods,
+                            })
+                        upsert_external_events_many(conn, round_no, moves_clean)
+
+                        # Apply external modifiers to EU state (preview will show before/after)
+                        global_context = str(moves_obj.get("global_context", eu_before.global_context) or "")
+                        eu_after = apply_external_modifiers_to_eu(eu_before, {"moves": moves_clean, "global_context": global_context})
+                        set_eu_state(conn, **eu_after.as_dict(), commit=False)
+
+                        # --- Domestic events ---
+                        dom_events = dom_obj.get("events", {}) or {}
+                        upsert_domestic_events_many(conn, round_no, {c: (dom_events.get(c, {}) or {}) for c in countries})
+
+                        set_game_meta(conn, round_no, "external_generated", expected_version=claimed_version, commit=False)
+                except StaleGameMetaError:
+                    # z.B. Reset während der LLM-Calls: Transaktion ist zurückgerollt
+                    _stale_rerun()
             st.rerun()
 
         # ---------------------
@@ -297,9 +347,9 @@ def render_gm_controls(
         st.write("---")
         st.markdown("#### Preview (read-only)")
 
-        ext_now = get_external_events(conn, round_no)
-        dom_now = get_domestic_events(conn, round_no)
-        eu_now = get_eu_state(conn)
+        ext_now = cached_external_events(conn, db_version(conn), round_no)
+        dom_now = cached_domestic_events(conn, db_version(conn), round_no)
+        eu_now = cached_eu_state(conn, db_version(conn))
 
         with st.expander("🌐 Außenmächte-Moves (Preview)", expanded=True):
             _render_external_preview(ext_now)
@@ -309,15 +359,15 @@ def render_gm_controls(
 
         with st.expander("🧮 EU-State Preview (Before/After)", expanded=False):
             st.caption(
-                f"Vorher (Start Runde): Kohäsion {eu_before['cohesion']} | Threat {eu_before['threat_level']} | Frontline {eu_before['frontline_pressure']} | "
-                f"Energy {eu_before['energy_pressure']} | Migration {eu_before['migration_pressure']} | Disinfo {eu_before['disinfo_pressure']} | TradeWar {eu_before['trade_war_pressure']}"
+                f"Vorher (Start Runde): Kohäsion {eu_before.cohesion} | Threat {eu_before.threat_level} | Frontline {eu_before.frontline_pressure} | "
+                f"Energy {eu_before.energy_pressure} | Migration {eu_before.migration_pressure} | Disinfo {eu_before.disinfo_pressure} | TradeWar {eu_before.trade_war_pressure}"
             )
             st.caption(
-                f"Jetzt (nach Außenmächten): Kohäsion {eu_now['cohesion']} | Threat {eu_now['threat_level']} | Frontline {eu_now['frontline_pressure']} | "
-                f"Energy {eu_now['energy_pressure']} | Migration {eu_now['migration_pressure']} | Disinfo {eu_now['disinfo_pressure']} | TradeWar {eu_now['trade_war_pressure']}"
+                f"Jetzt (nach Außenmächten): Kohäsion {eu_now.cohesion} | Threat {eu_now.threat_level} | Frontline {eu_now.frontline_pressure} | "
+                f"Energy {eu_now.energy_pressure} | Migration {eu_now.migration_pressure} | Disinfo {eu_now.disinfo_pressure} | TradeWar {eu_now.trade_war_pressure}"
             )
-            if eu_now.get("global_context"):
-                st.info(eu_now["global_context"])
+            if eu_now.global_context:
+                st.info(eu_now.global_context)
 
         if have_gm_inputs:
             st.success("✅ GM Inputs vollständig (Außenmächte + Innenpolitik)")
@@ -339,7 +389,11 @@ def render_gm_controls(
             use_container_width=True,
             key=f"gm_publish_{round_no}",
         ):
-            set_game_meta(conn, round_no, "actions_published")
+            try:
+                with transaction(conn):
+                    set_game_meta(conn, round_no, "actions_published", expected_version=seen_version, commit=False)
+            except StaleGameMetaError:
+                _stale_rerun()
             st.rerun()
 
         # ---------------------
@@ -347,49 +401,42 @@ def render_gm_controls(
         # ---------------------
         st.markdown("#### 3) Runde auflösen")
 
-        have_all_locks = all_policies_locked(conn, round_no=round_no, countries=countries)
+        # Gleicher gecachter Read wie der Sidebar-Rundenstatus; gezählt wird in SQLite, Details lädt erst der Resolve-Handler
+        ready = cached_round_status(conn, db_version(conn))["locked_count"]
+        have_all_locks = ready == len(countries)
 
         if phase == "actions_published":
-            locks_now = get_policy_locks(conn, round_no=round_no)
-            ready = sum(
-                1
-                for c in countries
-                if (locks_now.get(c) or {}).get("foreign") and (locks_now.get(c) or {}).get("domestic")
-            )
             st.caption(f"Locked: {ready}/{len(countries)} Länder (Außen+Innen)")
 
         resolve_disabled = not (phase == "actions_published" and have_all_locks)
         if st.button("🧮 Ergebnis der Runde kalkulieren", disabled=resolve_disabled, use_container_width=True, key=f"gm_resolve_{round_no}"):
+            from ai_round import resolve_round_all_countries, generate_round_summary, generate_round_summary_stream
+
+            claimed_version = _claim_or_rerun(conn, seen_version)
             with st.spinner("KI kalkuliert Gesamtergebnis der Runde..."):
-                recent_summaries = get_recent_round_summaries(conn, limit=3)
+                recent_summaries = cached_recent_summaries(conn, db_version(conn), 3)
                 eu_before_resolve = get_eu_state(conn)
                 ext_events = get_external_events(conn, round_no)
                 dom_events = get_domestic_events(conn, round_no)
-                locks_now = get_policy_locks(conn, round_no=round_no)
+                # Locks + gewählte Kandidatentexte aller Länder in einem JOIN (statt 2 Queries pro Land)
+                locked_texts = get_locked_policy_texts(conn, round_no=round_no)
                 all_metrics = load_all_country_metrics(conn, countries)
 
                 actions_texts: Dict[str, Dict[str, str]] = {}
                 locked_choices: Dict[str, str] = {}
                 chosen_actions_lines: List[str] = []
-
-                def _get_candidate_text(country: str, domain: str, slot: int) -> str:
-                    candidates = get_policy_candidates(conn, round_no=round_no, country=country, domain=domain)
-                    cand = next((x for x in candidates if int(x.get("slot")) == int(slot)), None)
-                    return str((cand or {}).get("action_text", ""))
+                no_lock = {"foreign": (0, ""), "domestic": (0, "")}
 
                 for c in countries:
-                    ls = locks_now.get(c) or {}
-                    f_slot = int(ls.get("foreign") or 0)
-                    d_slot = int(ls.get("domestic") or 0)
-
-                    f_text = _get_candidate_text(c, "foreign", f_slot)
-                    d_text = _get_candidate_text(c, "domestic", d_slot)
+                    lt = locked_texts.get(c, no_lock)
+                    f_slot, f_text = lt["foreign"]
+                    d_slot, d_text = lt["domestic"]
 
                     combined = f"[Außenpolitik | Option {f_slot}]\n{f_text}\n\n[Innenpolitik | Option {d_slot}]\n{d_text}".strip()
 
                     actions_texts[c] = {"chosen": combined}
                     locked_choices[c] = "chosen"
-                    chosen_actions_lines.append(f"- {countries_display.get(c, c)}: Außen {f_slot} / Innen {d_slot}")
+                    chosen_actions_lines.append(f"- {countries_display[c]}: Außen {f_slot} / Innen {d_slot}")
 
                 chosen_actions_str = "\n".join(chosen_actions_lines)
 
@@ -397,7 +444,7 @@ def render_gm_controls(
                     api_key=api_key,
                     model="mistral-small",
                     round_no=round_no,
-                    eu_state=eu_before_resolve,
+                    eu_state=eu_before_resolve.as_dict(),
                     countries_metrics=all_metrics,
                     countries_display=countries_display,
                     actions_texts=actions_texts,
@@ -410,135 +457,112 @@ def render_gm_controls(
                     max_tokens=1700,
                 )
 
-                eu_after = dict(eu_before_resolve)
-                eu_after["cohesion"] = eu_before_resolve["cohesion"] + int(result["eu"].get("kohäsion_delta", 0))
-                eu_after["global_context"] = str(result["eu"].get("global_context", eu_before_resolve["global_context"]))
-                eu_after = decay_pressures(eu_after)
-
-                set_eu_state(
-                    conn,
-                    cohesion=eu_after["cohesion"],
-                    global_context=eu_after["global_context"],
-                    threat_level=eu_after["threat_level"],
-                    frontline_pressure=eu_after["frontline_pressure"],
-                    energy_pressure=eu_after["energy_pressure"],
-                    migration_pressure=eu_after["migration_pressure"],
-                    disinfo_pressure=eu_after["disinfo_pressure"],
-                    trade_war_pressure=eu_after["trade_war_pressure"],
-                )
-
-                # Baseline snapshot (round_no-1) if needed
-                all_metrics_before = load_all_country_metrics(conn, countries)
-                eu_before_for_progress = get_eu_state(conn)
-                max_snap = get_max_snapshot_round(conn)
-                need_baseline = (max_snap is None) and (round_no >= 1)
-
-                if need_baseline:
-                    if evaluate_all_countries is not None:
-                        win_eval_before = evaluate_all_countries(
-                            all_country_metrics=all_metrics_before,
-                            eu_state=eu_before_for_progress,
-                            country_defs=country_defs,
-                        )
-                        for c in countries:
-                            res = win_eval_before.get(c, {})
-                            progress_before = progress_from_conditions(res.get("results") or [])
-                            upsert_country_snapshot(
-                                conn,
-                                round_no=round_no - 1,
-                                country=c,
-                                metrics=all_metrics_before[c],
-                                victory_progress=progress_before,
-                                is_winner=bool(res.get("is_winner")),
-                            )
-                    else:
-                        for c in countries:
-                            upsert_country_snapshot(
-                                conn,
-                                round_no=round_no - 1,
-                                country=c,
-                                metrics=all_metrics_before[c],
-                                victory_progress=0.0,
-                                is_winner=False,
-                            )
-
-                # Apply deltas + history
-                for c in countries:
-                    d = result["länder"].get(c) or {}
-                    apply_country_deltas(conn, c, d)
-
-                    chosen_action_text = actions_texts[c]["chosen"]
-                    insert_turn_history(
-                        conn,
-                        country=c,
-                        round_no=round_no,
-                        action_public=chosen_action_text,
-                        global_context=eu_after["global_context"],
-                        deltas=d,
-                    )
-
-                eu_after_fresh = get_eu_state(conn)
-
-                summary_text = generate_round_summary(
-                    api_key=api_key,
-                    model="mistral-small",
-                    round_no=round_no,
-                    memory_in=recent_summaries,
-                    eu_before=eu_before_resolve,
-                    eu_after=eu_after_fresh,
-                    external_events=ext_events,
-                    domestic_events=dom_events,
-                    chosen_actions_str=chosen_actions_str,
-                    result_obj=result,
-                    temperature=0.4,
-                    top_p=0.95,
-                    max_tokens=520,
+                eu_after = replace(
+                    eu_before_resolve,
+                    cohesion=eu_before_resolve.cohesion + int(result["eu"].get("kohäsion_delta", 0)),
+                    global_context=str(result["eu"].get("global_context", eu_before_resolve.global_context)),
                 )
-                upsert_round_summary(conn, round_no, summary_text)
-
-                # Snapshots + win check
-                winners: List[str] = []
-                all_metrics_now = load_all_country_metrics(conn, countries)
-                eu_now = get_eu_state(conn)
+                # clamped == was set_eu_state speichert -> identisch zum früheren Re-Read nach dem Write
+                eu_after = decay_pressures(eu_after).clamped()
 
-                if evaluate_all_countries is not None:
+                def _snapshot_rows(metrics_by_country: Dict[str, Dict[str, Any]]):
+                    if evaluate_all_countries is None:
+                        return [(c, metrics_by_country[c], 0.0, False) for c in countries]
                     win_eval = evaluate_all_countries(
-                        all_country_metrics=all_metrics_now,
-                        eu_state=eu_now,
+                        all_country_metrics=metrics_by_country,
+                        eu_state=eu_after,
                         country_defs=country_defs,
                     )
+                    rows = []
                     for c in countries:
                         res = win_eval.get(c, {})
-                        is_winner_now = bool(res.get("is_winner"))
-                        progress = progress_from_conditions(res.get("results") or [])
-                        upsert_country_snapshot(
+                        rows.append((
+                            c,
+                            metrics_by_country[c],
+                            progress_from_conditions(res.get("results") or []),
+                            bool(res.get("is_winner")),
+                        ))
+                    return rows
+
+                need_baseline = get_max_snapshot_round(conn) is None and round_no >= 1
+                # Baseline snapshot (round_no-1) – all_metrics ist noch der Stand vor den Deltas
+                baseline_rows = _snapshot_rows(all_metrics) if need_baseline else None
+                deltas_by_country = {c: (result["länder"].get(c) or {}) for c in countries}
+                actions_and_deltas = {c: (actions_texts[c]["chosen"], deltas_by_country[c]) for c in countries}
+
+                # Eine Transaktion (ein fsync) für alle Writes der Runde; Reads darin sehen die eigenen Writes.
+                try:
+                    with transaction(conn):
+                        set_eu_state(conn, **eu_after.as_dict(), commit=False)
+
+                        if baseline_rows is not None:
+                            upsert_country_snapshots_many(conn, round_no=round_no - 1, rows=baseline_rows)
+
+                        # Apply deltas + history
+                        apply_country_deltas_many(conn, deltas_by_country)
+                        insert_turn_history_many(
                             conn,
                             round_no=round_no,
-                            country=c,
-                            metrics=all_metrics_now[c],
-                            victory_progress=progress,
-                            is_winner=is_winner_now,
+                            global_context=eu_after.global_context,
+                            actions_and_deltas=actions_and_deltas,
                         )
-                        if is_winner_now:
-                            winners.append(c)
-                else:
-                    for c in countries:
-                        upsert_country_snapshot(
-                            conn,
-                            round_no=round_no,
-                            country=c,
-                            metrics=all_metrics_now[c],
-                            victory_progress=0.0,
-                            is_winner=False,
-                        )
-
-                # Clean round-specific choice data (candidates/locks) for this round
-                clear_round_data(conn, round_no)
-
-                if winners:
-                    set_game_over(conn, winner_country=winners[0], winner_round=round_no, reason="win_conditions")
-                else:
-                    set_game_meta(conn, round_no + 1, "setup")
+                        # Snapshots + win check – Werte nach den Deltas in-memory statt erneutem SELECT
+                        snap_rows = _snapshot_rows({
+                            c: country_metrics_after_deltas(all_metrics[c], deltas_by_country[c]) for c in countries
+                        })
+                        upsert_country_snapshots_many(conn, round_no=round_no, rows=snap_rows)
+                        winners = [c for c, _m, _p, is_winner_now in snap_rows if is_winner_now]
+
+                        # Clean round-specific choice data (candidates/locks) for this round
+                        clear_round_data(conn, round_no, commit=False)
+
+                        if winners:
+                            set_game_over(
+                                conn,
+                                winner_country=winners[0],
+                                winner_round=round_no,
+                                reason="win_conditions",
+                                expected_version=claimed_version,
+                                commit=False,
+                            )
+                        else:
+                            set_game_meta(conn, round_no + 1, "setup", expected_version=claimed_version, commit=False)
+                except StaleGameMetaError:
+                    # z.B. Reset während der LLM-Calls: Transaktion ist zurückgerollt
+                    _stale_rerun()
+
+            # Spielstand ist committed (Spieler sehen die neue Runde sofort); die Summary hängt nur an
+            # result/eu_after und wird live mitgestreamt statt hinter dem Spinner zu warten.
+            st.markdown(f"**📝 Zusammenfassung Runde {round_no}**")
+            summary_kwargs = dict(
+                api_key=api_key,
+                model="mistral-small",
+                round_no=round_no,
+                memory_in=recent_summaries,
+                eu_before=eu_before_resolve.as_dict(),
+                eu_after=eu_after.as_dict(),
+                external_events=ext_events,
+                domestic_events=dom_events,
+                chosen_actions_str=chosen_actions_str,
+                result_obj=result,
+                temperature=0.4,
+                top_p=0.95,
+                max_tokens=520,
+            )
+            try:
+                summary_text = st.write_stream(generate_round_summary_stream(**summary_kwargs))
+            except Exception:
+                # Runde ist schon committed -> Stream-Fehler darf die Summary-Zeile nicht kosten:
+                # einmal nicht-streamend (JSON-Mode) nachholen, sonst Platzhalter speichern.
+                try:
+                    with st.spinner("Stream abgebrochen – Zusammenfassung wird nachgeholt..."):
+                        summary_text = generate_round_summary(**summary_kwargs)
+                except Exception:
+                    summary_text = ""
+                    st.warning("Zusammenfassung konnte nicht generiert werden.")
+            summary_text = str(summary_text or "").strip() or "- (Keine Summary generiert)"
+            with transaction(conn):
+                upsert_round_summary(conn, round_no, summary_text, commit=False)
 
             st.success("Runde aufgelöst.")
             st.rerun()
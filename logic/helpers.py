@@ -1,35 +1,47 @@
-from typing import Dict, Any, List
+from functools import lru_cache
+from typing import Dict, Any, List, Tuple
 
 
 def summarize_recent_actions(rows) -> str:
     if not rows:
         return "Keine."
-    items = []
-    for r in rows[:6]:
-        items.append(f"R{r[0]}: {r[1]}")
-    return " | ".join(items)
+    return _summarize_cached(tuple((r[0], r[1]) for r in rows[:6]))
+
+
+@lru_cache(maxsize=256)
+def _summarize_cached(items: Tuple[Tuple[int, str], ...]) -> str:
+    return " | ".join(f"R{r}: {a}" for r, a in items)
 
 
 def format_external_events(events: List[Dict[str, Any]]) -> str:
     if not events:
         return "Keine."
+    # Dieselben Events gelten für alle Länder einer Runde -> nur die genutzten Felder als Cache-Key
+    key = tuple(
+        (e.get("actor"), int(e.get("craziness", 0) or 0), e.get("headline"), (e.get("quote") or "").strip())
+        for e in events
+    )
+    return _format_external_cached(key)
+
+
+@lru_cache(maxsize=64)
+def _format_external_cached(events: Tuple[Tuple[Any, int, Any, str], ...]) -> str:
     lines = []
-    for e in events:
-        c = int(e.get("craziness", 0) or 0)
-        q = (e.get("quote") or "").strip()
+    for actor, c, headline, q in events:
         if q:
-            lines.append(f"- {e.get('actor')} (crazy={c}/100): {e.get('headline')} — {q}")
+            lines.append(f"- {actor} (crazy={c}/100): {headline} — {q}")
         else:
-            lines.append(f"- {e.get('actor')} (crazy={c}/100): {e.get('headline')}")
+            lines.append(f"- {actor} (crazy={c}/100): {headline}")
     return "\n".join(lines)
 
 
+_ARROWS = ("⬇️", "➖", "⬆️")
+_RISKS = ("Risiko: ✅ niedrig", "Risiko: ⚠️ mittel", "Risiko: 🔥 hoch")
+
+
 def _arrow(delta: int) -> str:
-    if delta >= 3:
-        return "⬆️"
-    if delta <= -3:
-        return "⬇️"
-    return "➖"
+    # Index 0/1/2 = fällt/neutral/steigt (Schwelle ±3), ohne if-Kette
+    return _ARROWS[(delta >= 3) - (delta <= -3) + 1]
 
 
 def impact_preview_text(folgen: Dict[str, Any]) -> str:
@@ -43,15 +55,14 @@ def impact_preview_text(folgen: Dict[str, Any]) -> str:
     dp = int(land.get("öffentliche_zustimmung", 0))
     dcoh = int(eu.get("kohäsion", 0))
 
+    return _impact_line(dm, ds, de, dd, dp, dcoh)
+
+
+# Reine Funktion über sechs kleine ints -> GM-Vergleichsansichten rendern dieselben Kombinationen immer wieder
+@lru_cache(maxsize=1024)
+def _impact_line(dm: int, ds: int, de: int, dd: int, dp: int, dcoh: int) -> str:
     max_abs = max(abs(dm), abs(ds), abs(de), abs(dd), abs(dp), abs(dcoh))
-    if max_abs >= 9:
-        risk = "Risiko: 🔥 hoch"
-    elif max_abs >= 6:
-        risk = "Risiko: ⚠️ mittel"
-    else:
-        risk = "Risiko: ✅ niedrig"
-
-    return (
-        f"Mil {_arrow(dm)}  Sta {_arrow(ds)}  Wir {_arrow(de)}  "
-        f"Dip {_arrow(dd)}  Zust {_arrow(dp)}  EU {_arrow(dcoh)}  •  {risk}"
-    )
+    risk = _RISKS[(max_abs >= 6) + (max_abs >= 9)]
+    a = [_arrow(d) for d in (dm, ds, de, dd, dp, dcoh)]
+
+    return f"Mil {a[0]}  Sta {a[1]}  Wir {a[2]}  Dip {a[3]}  Zust {a[4]}  EU {a[5]}  •  {risk}"
@@ -1,12 +1,11 @@
 import html
+from functools import lru_cache
 from typing import Any, Dict, List
 
 import streamlit as st
 
 
-def inject_css():
-    st.markdown(
-        """
+_CSS = """
 <style>
 /* Inline tooltip for ℹ️ */
 .eug-tooltip {
@@ -68,9 +67,16 @@ def inject_css():
 .eug-kv-label{ font-size: 0.88rem; opacity: 0.85; }
 .eug-kv-value{ font-size: 0.95rem; font-weight: 600; }
 </style>
-""",
-        unsafe_allow_html=True,
-    )
+"""
+# Einrückung/Leerzeilen raus: das Stylesheet geht bei jedem Rerun über den Websocket
+_CSS = " ".join(line.strip() for line in _CSS.splitlines() if line.strip())
+
+
+def inject_css():
+    # Bewusst ohne session_state-Guard: Streamlit entfernt beim Rerun jedes Element, das nicht erneut
+    # gesendet wird -> das Stylesheet (und damit alle Tooltips) wäre ab dem zweiten Run weg.
+    # Der String ist eine Modul-Konstante und wird nicht pro Run neu gebaut.
+    st.markdown(_CSS, unsafe_allow_html=True)
 
 
 VALUE_HELP = {
@@ -89,10 +95,20 @@ VALUE_HELP = {
 }
 
 
+@lru_cache(maxsize=128)
+def _esc(s: str) -> str:
+    return html.escape(s or "")
+
+
+# Tooltip-Texte sind fast immer VALUE_HELP-Einträge -> einmal beim Import escapen
+for _help in VALUE_HELP.values():
+    _esc(_help)
+
+
 def compact_kv(label: str, value: Any, help_text: str | None = None):
     label_html = label
     if help_text:
-        safe = html.escape(help_text)
+        safe = _esc(help_text)
         label_html = (
             f"""{label} <span class="eug-tooltip" style="margin-left:4px;">ℹ️"""
             f"""<span class="eug-tooltiptext">{safe}</span></span>"""
@@ -116,7 +132,7 @@ def metric_with_info(label: str, value: Any, help_text: str) -> None:
     with a:
         st.metric(label, value)
     with b:
-        safe = html.escape(help_text or "")
+        safe = _esc(help_text or "")
         st.markdown(
             f"""
 <span class="eug-tooltip">ℹ️
@@ -1,29 +1,45 @@
 from cmath import phase
 import html
-from typing import Dict, Any, List, Optional, Tuple
+import time
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Tuple
 
 import streamlit as st
-from mistralai import Mistral
 
 from ui.components import VALUE_HELP, compact_kv, metric_with_info
 from logic.helpers import impact_preview_text, summarize_recent_actions, format_external_events
-from utils import content_to_text, parse_json_maybe
+from utils import content_to_text, parse_json_maybe, log_llm_call
 
 from db import (
-    load_country_metrics,
-    load_recent_history,
-    get_external_events,
-    get_domestic_events,
-    get_country_snapshots,
+    EUState,
+    transaction,
     # NEW policy flow
-    get_policy_candidates,
     count_policy_candidates,
     upsert_policy_candidate,
     lock_policy_slot,
-    get_policy_locks,
+    get_country_snapshots,
+    get_country_snapshots_since,
+    get_snapshot_marker,
+    get_progress_watermark,
+)
+
+from logic.cache import (
+    db_version,
+    cached_eu_state,
+    cached_policy_locks,
+    cached_external_events,
+    cached_domestic_events,
+    cached_snapshot_leaderboard,
+    cached_country_metrics,
+    cached_round_history,
+    cached_round_status,
+    cached_recent_history,
+    cached_policy_candidates,
 )
+from countries import COUNTRY_DEFS, DisplayNames
 
-from countries import COUNTRY_DEFS
+if TYPE_CHECKING:
+    # Mistral-SDK erst beim ersten KI-Klick laden (siehe _generate_policy_candidate)
+    from mistralai import Mistral
 
 # Optional: win.py (falls vorhanden)
 try:
@@ -35,18 +51,22 @@ except Exception:
 # -----------------------------
 # Small AI helpers (single-policy JSON)
 # -----------------------------
-def _chat(client: Mistral, model: str, messages, temperature: float, top_p: float, max_tokens: int) -> str:
+def _chat(client: "Mistral", model: str, messages, temperature: float, top_p: float, max_tokens: int) -> str:
+    started = time.perf_counter()
     resp = client.chat.complete(
         model=model,
         messages=messages,
         max_tokens=max_tokens,
         temperature=temperature,
         top_p=top_p,
+        # JSON-Mode: Decoder ist auf gültiges JSON beschränkt -> Repair-Roundtrip nur noch im Ausnahmefall
+        response_format={"type": "json_object"},
     )
+    log_llm_call(__name__, model, started, resp.usage)
     return content_to_text(resp.choices[0].message.content)
 
 
-def _repair_to_valid_json(client: Mistral, model: str, bad_text: str, schema_hint: str) -> Dict[str, Any]:
+def _repair_to_valid_json(client: "Mistral", model: str, bad_text: str, schema_hint: str) -> Dict[str, Any]:
     repair_prompt = f"""
 Du bist ein Validator/Formatter. Wandle die folgende Ausgabe in **gültiges JSON** um.
 
@@ -77,44 +97,27 @@ Hier ist die zu reparierende Ausgabe:
     return parse_json_maybe(fixed_raw)
 
 
-def _build_policy_prompt(
-    *,
-    domain: str,  # "foreign" | "domestic"
-    aggressiveness: int,
-    country_display: str,
-    metrics: Dict[str, Any],
-    eu_state: Dict[str, Any],
-    external_events: List[Dict[str, Any]],
-    domestic_headline: str,
-    recent_actions_summary: str,
-) -> str:
-    ext_str = format_external_events(external_events)
-
-    if domain == "foreign":
-        domain_label = "Außenpolitik / Geopolitik / Sicherheit / Diplomatie"
-        focus = """
+# Statische Teile des Policy-Prompts einmal beim Import; pro Aufruf nur noch ein format_map
+_POLICY_DOMAINS = {
+    "foreign": (
+        "Außenpolitik / Geopolitik / Sicherheit / Diplomatie",
+        """
 Fokus:
 - Abschreckung, Bündnisse, Sanktionen, Diplomatie, militärische Bereitschaft, internationale Kommunikation.
 - Berücksichtige Threat/Frontline/Energy/Migration/Disinfo/TradeWar-Druck.
-"""
-    else:
-        domain_label = "Innenpolitik / Gesellschaft / Wirtschaft / Stabilität"
-        focus = """
+""",
+    ),
+    "domestic": (
+        "Innenpolitik / Gesellschaft / Wirtschaft / Stabilität",
+        """
 Fokus:
 - Innenpolitische Stabilität, Zustimmung, Reformen, Wirtschaft, Medien, Krisenmanagement, gesellschaftliche Spannungen.
 - Berücksichtige innenpolitisches Event (Headline) stark.
-"""
-
-    scale = f"""
-Aggressivitätsskala ({aggressiveness}/100):
-- 0–20: extrem vorsichtig, deeskalierend, risikoscheu
-- 21–40: eher vorsichtig, defensive Politik
-- 41–60: ausgewogen, moderate Risiken
-- 61–80: offensiv, hoher Einsatz, spürbare Risiken
-- 81–100: maximal aggressiv, sehr risikoreich (kann Zustimmung/Stabilität kosten)
-"""
+""",
+    ),
+}
 
-    schema_hint = """
+_POLICY_SCHEMA_HINT = """
 {
   "aktion": "...",
   "folgen": {
@@ -125,27 +128,45 @@ Aggressivitätsskala ({aggressiveness}/100):
 }
 """.strip()
 
-    return f"""
+# Statischer Teil zuerst (für alle Länder/Domains identischer Prompt-Anfang -> provider-seitiges Prefix-Caching);
+# alles Rundenabhängige (Domain, Land, Werte, Events) steht erst dahinter.
+_POLICY_PROMPT_TEMPLATE = """
 Du bist eine Simulations-Engine in einem EU-Geopolitik-Spiel.
 
-Erzeuge GENAU EINE öffentliche Aktion für {country_display}.
+Aggressivitätsskala (0–100):
+- 0–20: extrem vorsichtig, deeskalierend, risikoscheu
+- 21–40: eher vorsichtig, defensive Politik
+- 41–60: ausgewogen, moderate Risiken
+- 61–80: offensiv, hoher Einsatz, spürbare Risiken
+- 81–100: maximal aggressiv, sehr risikoreich (kann Zustimmung/Stabilität kosten)
+
+Output Regeln:
+- Gib NUR gültiges JSON zurück (kein Markdown, keine Erklärungen).
+- Folgen sind kleine realistische Ganzzahlen (typisch -12..+12).
+- global_context ist ein kurzer Satz (max 1 Zeile).
+- Achte darauf, dass die Aktion zur Domain passt.
+
+Schema:
+{schema_hint}
+
 Domain: {domain_label}
 
 {focus}
 
-{scale}
+Erzeuge GENAU EINE öffentliche Aktion für {country_display}.
+Aggressivität: {aggressiveness}/100
 
 Kontext:
-- {country_display} Metriken: Militär={metrics["military"]}, Stabilität={metrics["stability"]}, Wirtschaft={metrics["economy"]},
-  Diplomatie={metrics["diplomatic_influence"]}, Öffentliche Zustimmung={metrics["public_approval"]}.
-- Ambition: {metrics["ambition"]}.
+- {country_display} Metriken: Militär={military}, Stabilität={stability}, Wirtschaft={economy},
+  Diplomatie={diplomatic_influence}, Öffentliche Zustimmung={public_approval}.
+- Ambition: {ambition}.
 
 EU-/Weltlage:
-- EU-Kohäsion={eu_state["cohesion"]}%
-- Threat Level={eu_state["threat_level"]}/100, Frontline Pressure={eu_state["frontline_pressure"]}/100
-- Energy={eu_state["energy_pressure"]}/100, Migration={eu_state["migration_pressure"]}/100
-- Disinfo={eu_state["disinfo_pressure"]}/100, TradeWar={eu_state["trade_war_pressure"]}/100
-- Globaler Kontext: {eu_state["global_context"]}
+- EU-Kohäsion={cohesion}%
+- Threat Level={threat_level}/100, Frontline Pressure={frontline_pressure}/100
+- Energy={energy_pressure}/100, Migration={migration_pressure}/100
+- Disinfo={disinfo_pressure}/100, TradeWar={trade_war_pressure}/100
+- Globaler Kontext: {global_context}
 
 Außenmächte-Moves dieser Runde:
 {ext_str}
@@ -155,16 +176,33 @@ Innenpolitisches Event (diese Runde, Land):
 
 Letzte Aktionen (für Variation, nicht wiederholen):
 {recent_actions_summary}
+""".strip()
 
-Output Regeln:
-- Gib NUR gültiges JSON zurück (kein Markdown, keine Erklärungen).
-- Folgen sind kleine realistische Ganzzahlen (typisch -12..+12).
-- global_context ist ein kurzer Satz (max 1 Zeile).
-- Achte darauf, dass die Aktion zur Domain passt.
 
-Schema:
-{schema_hint}
-""".strip()
+def _build_policy_prompt(
+    *,
+    domain: str,  # "foreign" | "domestic"
+    aggressiveness: int,
+    country_display: str,
+    metrics: Dict[str, Any],
+    eu_state: EUState,
+    external_events: List[Dict[str, Any]],
+    domestic_headline: str,
+    recent_actions_summary: str,
+) -> str:
+    domain_label, focus = _POLICY_DOMAINS["foreign" if domain == "foreign" else "domestic"]
+    return _POLICY_PROMPT_TEMPLATE.format_map({
+        **metrics,
+        **eu_state.as_dict(),
+        "country_display": country_display,
+        "domain_label": domain_label,
+        "focus": focus,
+        "aggressiveness": aggressiveness,
+        "ext_str": format_external_events(external_events),
+        "domestic_headline": domestic_headline,
+        "recent_actions_summary": recent_actions_summary,
+        "schema_hint": _POLICY_SCHEMA_HINT,
+    })
 
 
 def _generate_policy_candidate(
@@ -176,6 +214,8 @@ def _generate_policy_candidate(
     top_p: float = 0.95,
     max_tokens: int = 900,
 ) -> Tuple[Dict[str, Any], str]:
+    from mistralai import Mistral
+
     client = Mistral(api_key=api_key)
 
     raw = _chat(
@@ -243,21 +283,114 @@ def _progress_from_conditions(cond_results) -> float:
         return 0.0
 
 
+@st.fragment(run_every="2s")
+def render_round_status(conn, *, countries: List[str], countries_display: Dict[str, str], is_gm: bool) -> None:
+    """Sidebar "Rundenstatus" als Fragment: läuft unabhängig vom Rest der Seite neu."""
+    status = cached_round_status(conn, db_version(conn))
+    meta = status["meta"]
+    round_no = meta["round"]
+    locks = status["locks"]
+
+    with st.expander("📊 Rundenstatus", expanded=False):
+        st.write(f"**Runde:** {round_no}  |  **Phase:** {meta['phase']}")
+        winner_country = meta.get("winner_country")
+        if meta["phase"] == "game_over" and winner_country:
+            st.success(f"🏆 Gewinner: {countries_display[winner_country]} (R{meta.get('winner_round')})")
+
+        st.write("**Lock-Status (diese Runde)**")
+        # Eine Markdown-Zeile je Land in einem Element statt st.success/st.warning pro Land
+        lines = []
+        for c in countries:
+            name = countries_display[c]
+            lc = locks.get(c) or {}
+            f = lc.get("foreign")
+            d = lc.get("domestic")
+
+            if f and d:
+                detail = f" (Außen: {f} | Innen: {d})" if is_gm else ""
+                lines.append(f"🟢 {name}: ✅ eingelockt{detail}")
+            elif f or d:
+                detail = f" (Außen: {f or '—'} | Innen: {d or '—'})" if is_gm else " eingelockt"
+                lines.append(f"🟡 {name}: ⏳ teilweise{detail}")
+            else:
+                lines.append(f"🟡 {name}: ⏳ nicht eingelockt")
+        st.markdown("  \n".join(lines))
+
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def _cached_win_eval(country: str, metrics_items: Tuple[Tuple[str, Any], ...], eu: EUState):
+    """Siegbedingungen sind eine reine Funktion von (Land, Werte, EU-State) -> Fragment-Ticks ohne Änderung treffen den Cache."""
+    return evaluate_country_win_conditions(
+        country,
+        country_metrics=dict(metrics_items),
+        eu_state=eu,
+        country_defs=COUNTRY_DEFS,
+    )
+
+
+@st.fragment(run_every="2s")
+def render_status_panel(conn, *, panel_country: Optional[str], countries_display: Dict[str, str]) -> None:
+    """Rechte Spalte (eigene Werte, EU-Druckwerte, Siegfortschritt) als eigenständig aktualisierendes Fragment."""
+    my_metrics = cached_country_metrics(conn, db_version(conn), panel_country) if panel_country else None
+    eu = cached_eu_state(conn, db_version(conn))
+
+    if panel_country:
+        if my_metrics:
+            render_my_metrics_panel(my_metrics, countries_display[panel_country])
+        else:
+            st.warning("Eigene Länderwerte konnten nicht geladen werden.")
+    else:
+        st.info("Kein Land aktiv.")
+
+    st.write("---")
+
+    st.subheader("EU & Druckwerte")
+    metric_with_info("EU Kohäsion", f"{eu.cohesion}%", VALUE_HELP["EU Kohäsion"])
+
+    compact_kv("Threat", f"{eu.threat_level}/100", VALUE_HELP["Threat"])
+    compact_kv("Frontline", f"{eu.frontline_pressure}/100", VALUE_HELP["Frontline"])
+    compact_kv("Energy", f"{eu.energy_pressure}/100", VALUE_HELP["Energy"])
+    compact_kv("Migration", f"{eu.migration_pressure}/100", VALUE_HELP["Migration"])
+    with st.expander("Mehr Details (Druckwerte)", expanded=False):
+        compact_kv("Disinfo", f"{eu.disinfo_pressure}/100", VALUE_HELP["Disinfo"])
+        compact_kv("TradeWar", f"{eu.trade_war_pressure}/100", VALUE_HELP["TradeWar"])
+
+    st.write("---")
+
+    st.subheader("🏁 Siegfortschritt")
+    if not panel_country or not my_metrics:
+        st.caption("Siegfortschritt wird angezeigt, sobald ein Land aktiv ist.")
+    elif evaluate_country_win_conditions is None:
+        st.caption("Siegbedingungen-Modul nicht geladen.")
+    else:
+        is_winner, cond_results = _cached_win_eval(panel_country, tuple(sorted(my_metrics.items())), eu)
+        if not cond_results:
+            st.warning("Für dieses Land sind noch keine Siegbedingungen definiert (countries.py: win_conditions).")
+        else:
+            prog = _progress_from_conditions(cond_results)
+            st.progress(int(prog))
+            st.caption(f"{prog:.0f}% der Siegbedingungen erfüllt.")
+            if is_winner:
+                st.success("✅ Siegbedingungen erfüllt! Du hast gewonnen.")
+            for r in cond_results:
+                st.write(("✅ " if r.ok else "❌ ") + f"{r.label} (aktuell: {r.current})")
+
+
 def render_news_panel(
     conn,
     *,
     round_no: int,
-    eu: Dict[str, Any],
+    eu: EUState,
     countries: List[str],
     countries_display: Dict[str, str],
     my_country: str,
 ) -> None:
     st.subheader("🗞️ News")
     st.write("Hallo " + COUNTRY_DEFS[my_country]["Leader"] + "!"),
-    if eu.get("global_context"):
-        st.info(eu["global_context"])
+    if eu.global_context:
+        st.info(eu.global_context)
 
-    ext_events_now = get_external_events(conn, round_no)
+    ext_events_now = cached_external_events(conn, db_version(conn), round_no)
     if ext_events_now:
         with st.expander("🌐 Außenmächte-Moves (aktuelle Runde)", expanded=True):
             for e in ext_events_now:
@@ -269,11 +402,11 @@ def render_news_panel(
     else:
         st.caption("Keine Außenmächte-Moves (noch nicht generiert).")
 
-    dom_now = get_domestic_events(conn, round_no)
+    dom_now = cached_domestic_events(conn, db_version(conn), round_no)
     if dom_now:
         with st.expander("🏠 Innenpolitik (aktuelle Runde)", expanded=True):
             for e in dom_now:
-                name = countries_display.get(e["country"], e["country"])
+                name = countries_display[e["country"]]
                 c = int(e.get("craziness", 0) or 0)
                 st.markdown(f"**{name}** (🎲 {c}/100): {e['headline']}")
                 if e.get("details"):
@@ -282,46 +415,151 @@ def render_news_panel(
         st.caption("Keine Innenpolitik-Headlines (noch nicht generiert).")
 
 
+# Ältere Runden erst auf Wunsch rendern: normaler Rerun kostet O(_HISTORY_RECENT) statt O(alle Runden)
+_HISTORY_RECENT = 5
+
+
+@st.fragment
+def render_round_history(conn, *, countries_display: Dict[str, str]) -> None:
+    """
+    Runden-Historie (Außenmächte + Länderaktionen) als Fragment: der "Ältere Runden"-Toggle
+    rerunt nur diesen Block. Daten kommen komplett aus dem gecachten Prefetch (ein Read pro DB-Stand).
+    """
+    version = db_version(conn)
+    history = cached_round_history(conn, version)
+    all_rounds = history["rounds"]
+
+    if not all_rounds:
+        st.caption("Noch keine Historie vorhanden.")
+        return
+
+    shown = all_rounds
+    if len(all_rounds) > _HISTORY_RECENT:
+        if not st.toggle(f"Alle {len(all_rounds)} Runden anzeigen", key="history_show_all"):
+            shown = all_rounds[:_HISTORY_RECENT]
+
+    pre = _format_history(history, version, tuple(sorted(countries_display.items())))
+
+    # Optional: kompakt zuerst die neueste Runde anzeigen
+    for r in shown:
+        ext_lines, action_lines = pre[r]
+        with st.expander(f"Runde {r}", expanded=(r == all_rounds[0])):
+            # 1) Außenmächte dieser Runde
+            if ext_lines:
+                st.markdown("**🌐 Außenmächte**")
+                for line_md, quote in ext_lines:
+                    st.markdown(line_md)
+                    if quote:
+                        st.caption(quote)
+            else:
+                st.caption("Keine Außenmächte-Moves für diese Runde.")
+
+            st.write("---")
+
+            # 2) Aktionen der Länder dieser Runde (aus turn_history)
+            st.markdown("**🏛️ Länderaktionen**")
+            if not action_lines:
+                st.caption("Keine Länderaktionen gespeichert (evtl. Runde noch nicht resolved).")
+            else:
+                for name_md, action_public, ctx in action_lines:
+                    st.markdown(name_md)
+                    st.write(action_public)
+                    if ctx:
+                        st.caption(ctx)
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def _format_history(_history: Dict[str, Any], version, display_items: Tuple[Tuple[str, str], ...]):
+    """
+    Markdown/Caption-Strings der Historie einmal pro DB-Stand bauen:
+    {round: ([(line_md, quote_caption|None)], [(name_md, action_public, context_caption|None)])}.
+    """
+    display = DisplayNames(display_items)
+    out = {}
+    for r in _history["rounds"]:
+        ext_lines = []
+        for e in _history["external"].get(r, []):
+            c = int(e.get("craziness", 0) or 0)
+            q = (e.get("quote") or "").strip()
+            ext_lines.append((
+                f"- **{e['actor']}** (🎲 {c}/100): {e['headline']}",
+                f"🗣️ {q}" if q and q != "—" else None,
+            ))
+        action_lines = [
+            (f"**{display[country]}**", action_public, f"Kontext: {global_context}" if global_context else None)
+            for country, action_public, global_context in _history["actions"].get(r, [])
+        ]
+        out[r] = (ext_lines, action_lines)
+    return out
+
+
+_CHART_METRICS = ("victory_progress", "economy", "stability", "military", "diplomatic_influence", "public_approval")
+
+
+def _load_snapshots(conn) -> Dict[str, Any]:
+    """
+    Inkrementeller Snapshot-Cache pro Session: {"version", "max_round", "first_ts", "rows"} (Chart-Daten).
+    Nachgeladen wird nur ab der jüngsten bekannten Runde (inkl. – sie kann beim letzten Lesen noch halb geschrieben gewesen sein).
+    """
+    version = db_version(conn)
+    cache = st.session_state.get("_snap_cache")
+    if cache and cache["version"] == version:
+        return cache
+
+    max_db, first_ts = get_snapshot_marker(conn)
+    if not cache or max_db is None or max_db < cache["max_round"] or first_ts != cache.get("first_ts"):
+        # Erster Lauf oder Reset (Snapshots gelöscht bzw. neues Spiel mit neuer Baseline) -> voll laden
+        rows = get_country_snapshots(conn)
+    else:
+        since = cache["max_round"]
+        rows = [r for r in cache["rows"] if r["round"] < since] + get_country_snapshots_since(conn, since)
+
+    cache = {
+        "version": version,
+        "max_round": rows[-1]["round"] if rows else -1,
+        "first_ts": rows[0]["ts"] if rows else None,
+        "rows": rows,
+    }
+    st.session_state["_snap_cache"] = cache
+    return cache
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def _snapshot_pivot(_rows: List[Dict[str, Any]], version, display_items: Tuple[Tuple[str, str], ...]):
+    """Ein Pivot (round x Metrik/Land) pro DB-Stand; der Metrik-Selectbox reicht dann ein Spalten-Slice."""
+    import pandas as pd
+
+    display = DisplayNames(display_items)
+    df = pd.DataFrame(_rows)
+    df["country_name"] = df["country"].map(display.__getitem__)
+    return df.pivot_table(index="round", columns="country_name", values=list(_CHART_METRICS), aggfunc="max").sort_index()
+
+
 def render_public_dashboard(conn, *, countries: List[str], countries_display: Dict[str, str]):
     st.subheader("📊 Öffentliches Dashboard")
 
-    snapshots = get_country_snapshots(conn)
+    snap = _load_snapshots(conn)
+    snapshots = snap["rows"]
     if not snapshots:
         st.caption("Noch keine Daten: Dashboard füllt sich nach dem ersten Resolve (Runde 1).")
         return
 
-    latest_by_country: Dict[str, Dict[str, Any]] = {}
-    for row in snapshots:
-        c = row["country"]
-        if c not in latest_by_country or row["round"] > latest_by_country[c]["round"]:
-            latest_by_country[c] = row
-
-    leaderboard = sorted(
-        latest_by_country.values(),
-        key=lambda x: (x["victory_progress"], x["public_approval"]),
-        reverse=True,
-    )
-
-    cols = st.columns([0.26, 0.14, 0.12, 0.12, 0.12, 0.12, 0.12])
-    cols[0].markdown("**Land**")
-    cols[1].markdown("**Sieg %**")
-    cols[2].markdown("**Approval**")
-    cols[3].markdown("**Stabilität**")
-    cols[4].markdown("**Wirtschaft**")
-    cols[5].markdown("**Militär**")
-    cols[6].markdown("**Diplomatie**")
+    # Neuester Snapshot je Land + Sortierung direkt in SQL
+    leaderboard = cached_snapshot_leaderboard(conn, snap["version"])
 
+    # Eine Markdown-Tabelle statt 7 st.columns pro Land -> ein Element statt ~7×N pro Rerun
+    lines = [
+        "| Land | Sieg % | Approval | Stabilität | Wirtschaft | Militär | Diplomatie |",
+        "|:--|--:|--:|--:|--:|--:|--:|",
+    ]
     for r in leaderboard:
-        name = countries_display.get(r["country"], r["country"])
+        name = countries_display[r["country"]]
         badge = "🏆 " if r["is_winner"] else ""
-        cols = st.columns([0.26, 0.14, 0.12, 0.12, 0.12, 0.12, 0.12])
-        cols[0].write(f"{badge}{name}")
-        cols[1].write(f"{r['victory_progress']:.0f}%")
-        cols[2].write(r["public_approval"])
-        cols[3].write(r["stability"])
-        cols[4].write(r["economy"])
-        cols[5].write(r["military"])
-        cols[6].write(r["diplomatic_influence"])
+        lines.append(
+            f"| {badge}{name} | {r['victory_progress']:.0f}% | {r['public_approval']} | {r['stability']} "
+            f"| {r['economy']} | {r['military']} | {r['diplomatic_influence']} |"
+        )
+    st.markdown("\n".join(lines))
 
     st.write("---")
 
@@ -331,17 +569,14 @@ def render_public_dashboard(conn, *, countries: List[str], countries_display: Di
         st.caption("pandas nicht verfügbar → Charts deaktiviert.")
         return
 
-    df = pd.DataFrame(snapshots)
-    df["country_name"] = df["country"].map(lambda x: countries_display.get(x, x))
-
     metric = st.selectbox(
         "Chart-Metrik",
-        ["victory_progress", "economy", "stability", "military", "diplomatic_influence", "public_approval"],
+        list(_CHART_METRICS),
         index=0,
     )
 
-    pivot = df.pivot_table(index="round", columns="country_name", values=metric, aggfunc="max").sort_index()
-    st.line_chart(pivot, height=280)
+    pivot = _snapshot_pivot(snapshots, snap["version"], tuple(sorted(countries_display.items())))
+    st.line_chart(pivot[metric], height=280)
 
     if metric != "victory_progress":
         st.caption("Tipp: Stelle auf `victory_progress`, um den Siegfokus zu sehen.")
@@ -352,7 +587,7 @@ def _render_domain_block(
     conn,
     api_key: Optional[str],
     round_no: int,
-    eu: Dict[str, Any],
+    eu: EUState,
     countries_display: Dict[str, str],
     my_country: str,
     domain: str,  # "foreign" | "domestic"
@@ -362,7 +597,7 @@ def _render_domain_block(
     domain_title = "🌍 Außenpolitik" if domain == "foreign" else "🏠 Innenpolitik"
     st.markdown(f"### {domain_title}")
 
-    candidates = get_policy_candidates(conn, round_no=round_no, country=my_country, domain=domain)
+    candidates = cached_policy_candidates(conn, db_version(conn), round_no, my_country, domain)
     count = len(candidates)
 
     # slider defaults: keep last used aggressiveness if any
@@ -389,23 +624,25 @@ def _render_domain_block(
 
     if st.button(gen_label, disabled=gen_disabled, use_container_width=True, key=f"gen_{domain}_{round_no}_{my_country}"):
         with st.spinner("KI generiert Option..."):
-            metrics = load_country_metrics(conn, my_country)
+            # Gleiche DB-Version wie beim Rendern -> Reads kommen aus den bereits warmen Caches
+            version = db_version(conn)
+            metrics = cached_country_metrics(conn, version, my_country)
             if not metrics:
                 st.error("Konnte Länderwerte nicht laden.")
                 return
 
-            ext = get_external_events(conn, round_no)
-            dom_events = get_domestic_events(conn, round_no)
+            ext = cached_external_events(conn, version, round_no)
+            dom_events = cached_domestic_events(conn, version, round_no)
             dom_map = {e["country"]: e for e in dom_events}
             domestic_headline = (dom_map.get(my_country) or {}).get("headline") or "Keine auffälligen Ereignisse gemeldet."
 
-            recent = load_recent_history(conn, my_country, limit=12)
+            recent = cached_recent_history(conn, version, my_country, 12)
             recent_summary = summarize_recent_actions(recent)
 
             prompt = _build_policy_prompt(
                 domain=domain,
                 aggressiveness=int(aggressiveness),
-                country_display=countries_display.get(my_country, my_country),
+                country_display=countries_display[my_country],
                 metrics=metrics,
                 eu_state=eu,
                 external_events=ext,
@@ -430,16 +667,17 @@ def _render_domain_block(
             action_text = str(obj.get("aktion", "")).strip()
             folgen = obj.get("folgen", {}) or {}
 
-            upsert_policy_candidate(
-                conn,
-                round_no=round_no,
-                country=my_country,
-                domain=domain,
-                slot=int(slot),
-                aggressiveness=int(aggressiveness),
-                action_text=action_text,
-                impact=folgen,
-            )
+            with transaction(conn):
+                upsert_policy_candidate(
+                    conn,
+                    round_no=round_no,
+                    country=my_country,
+                    domain=domain,
+                    slot=int(slot),
+                    aggressiveness=int(aggressiveness),
+                    action_text=action_text,
+                    impact=folgen,
+                )
 
         st.rerun()
 
@@ -505,7 +743,21 @@ def _render_domain_block(
 
     lock_disabled = bool(already_locked_slot) or is_lock_disabled
     if st.button("✅ Diese Option locken", use_container_width=True, disabled=lock_disabled, key=f"lock_{domain}_{round_no}_{my_country}"):
-        lock_policy_slot(conn, round_no=round_no, country=my_country, domain=domain, slot=int(chosen_slot))
+        with transaction(conn):
+            lock_policy_slot(conn, round_no=round_no, country=my_country, domain=domain, slot=int(chosen_slot))
+        st.rerun()
+
+
+@st.fragment(run_every="4s")
+def _rerun_on_progress(conn, *, key: str) -> None:
+    """
+    Ersatz für Polling per Full-Rerun: alle 4s nur ein Mini-SELECT auf (round, phase, history-id).
+    Die ganze Seite läuft erst neu, wenn der GM tatsächlich etwas weiterbewegt hat.
+    """
+    wm = get_progress_watermark(conn)
+    prev = st.session_state.get(key)
+    st.session_state[key] = wm
+    if prev is not None and prev != wm:
         st.rerun()
 
 
@@ -514,7 +766,7 @@ def render_player_view(
     conn,
     round_no: int,
     phase: str,
-    eu: Dict[str, Any],
+    eu: EUState,
     countries_display: Dict[str, str],
     my_country: str,
     is_lock_disabled: bool,
@@ -534,11 +786,13 @@ def render_player_view(
     if phase != "actions_published":
         st.info("Spielerphase noch nicht aktiv. Warte auf den Game Master.")
         if not is_gm and phase != "game_over":
-            st.autorefresh(interval=8000, key=f"player_poll_{round_no}_{my_country}")
+            _rerun_on_progress(conn, key="_wm_player_poll")
         return
 
 
-    locks = get_policy_locks(conn, round_no=round_no)
+    # Gleicher gecachter Read wie der Rundenstatus in der Sidebar -> kein zweiter SQLite-Roundtrip.
+    status = cached_round_status(conn, db_version(conn))
+    locks = status["locks"] if status["meta"]["round"] == round_no else cached_policy_locks(conn, db_version(conn), round_no)
     my_locks = locks.get(my_country) or {}
     locked_foreign = my_locks.get("foreign")
     locked_domestic = my_locks.get("domestic")
@@ -555,7 +809,7 @@ def render_player_view(
     # Auto-refresh while waiting (players only)
     is_waiting = bool(locked_foreign and locked_domestic)
     if (not is_gm) and is_waiting and phase != "game_over":
-        st.autorefresh(interval=4000, key="player_wait_refresh_new")
+        _rerun_on_progress(conn, key="_wm_player_wait")
 
     # Domain blocks
     _render_domain_block(
@@ -586,7 +840,7 @@ def render_player_view(
 
     # Turn history
     with st.expander("📜 Turn-History (Mein Land)", expanded=False):
-        rows = load_recent_history(conn, my_country, limit=12)
+        rows = cached_recent_history(conn, db_version(conn), my_country, 12)
         if not rows:
             st.write("Noch keine Runden gespielt.")
         else:
@@ -1,7 +1,9 @@
 # utils.py
 import json
+import logging
 import re
-from typing import Any
+import time
+from typing import Any, Optional
 
 
 def content_to_text(content) -> str:
@@ -22,6 +24,12 @@ def content_to_text(content) -> str:
     return str(content)
 
 
+# Einmal kompiliert statt Pattern-Lookup in re's Cache bei jeder LLM-Antwort
+_FENCE_PREFIX = re.compile(r"^```(?:json)?\s*", re.IGNORECASE)
+_FENCE_SUFFIX = re.compile(r"\s*```$")
+_JSON_BODY = re.compile(r"(\{.*\}|\[.*\])", re.DOTALL)
+
+
 def parse_json_maybe(text: str) -> Any:
     """Parst JSON auch dann, wenn ```json ... ``` oder Text drumherum vorkommt."""
     s = (text or "").strip()
@@ -29,8 +37,8 @@ def parse_json_maybe(text: str) -> Any:
         raise ValueError("Leere Antwort vom Modell (kein JSON erhalten).")
 
     # Codefences entfernen
-    s = re.sub(r"^```(?:json)?\s*", "", s, flags=re.IGNORECASE)
-    s = re.sub(r"\s*```$", "", s)
+    s = _FENCE_PREFIX.sub("", s)
+    s = _FENCE_SUFFIX.sub("", s)
 
     # Direkt versuchen
     try:
@@ -39,7 +47,7 @@ def parse_json_maybe(text: str) -> Any:
         pass
 
     # Erstes JSON-Objekt/Array extrahieren
-    m = re.search(r"(\{.*\}|\[.*\])", s, flags=re.DOTALL)
+    m = _JSON_BODY.search(s)
     if not m:
         raise ValueError(f"Kein JSON gefunden. Anfang der Antwort: {s[:200]!r}")
     return json.loads(m.group(1))
@@ -47,3 +55,30 @@ def parse_json_maybe(text: str) -> Any:
 
 def clamp_int(x: int, lo: int = 0, hi: int = 100) -> int:
     return max(lo, min(hi, int(x)))
+
+
+# Eigener Handler: Streamlit konfiguriert nur seinen eigenen Logger, INFO-Zeilen gingen sonst verloren
+_llm_log = logging.getLogger("yourope.llm")
+if not _llm_log.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(asctime)s %(name)s %(message)s"))
+    _llm_log.addHandler(_handler)
+    _llm_log.setLevel(logging.INFO)
+    _llm_log.propagate = False
+
+
+def log_llm_call(source: str, model: str, started: float, usage: Any = None, *, ttft_ms: Optional[float] = None) -> None:
+    """
+    Latenz (+ Token-Usage, falls das SDK sie liefert) eines Mistral-Calls loggen.
+    started = time.perf_counter() vor dem Call; ttft_ms nur bei Streams.
+    """
+    latency_ms = (time.perf_counter() - started) * 1000.0
+    _llm_log.info(
+        "llm_call source=%s model=%s latency_ms=%.0f ttft_ms=%s prompt_tokens=%s completion_tokens=%s",
+        source,
+        model,
+        latency_ms,
+        f"{ttft_ms:.0f}" if ttft_ms is not None else "-",
+        getattr(usage, "prompt_tokens", None),
+        getattr(usage, "completion_tokens", None),
+    )
@@ -1,8 +1,11 @@
 # win.py
 from __future__ import annotations
+import operator
 from dataclasses import dataclass
 from typing import Any, Dict, List, Tuple, Optional
 
+from db import EUState
+
 
 @dataclass
 class ConditionResult:
@@ -13,14 +16,14 @@ class ConditionResult:
     op: str
 
 
-def _get_value(metric_key: str, country_metrics: Dict[str, Any], eu_state: Dict[str, Any]) -> Any:
+def _get_value(metric_key: str, country_metrics: Dict[str, Any], eu_state: EUState) -> Any:
     """
     Supported metric keys:
     - country metrics: military, stability, economy, diplomatic_influence, public_approval
     - eu: eu_cohesion
     """
     if metric_key == "eu_cohesion":
-        return int(eu_state.get("cohesion", 0))
+        return int(eu_state.cohesion)
 
     if metric_key in country_metrics:
         return country_metrics[metric_key]
@@ -28,25 +31,29 @@ def _get_value(metric_key: str, country_metrics: Dict[str, Any], eu_state: Dict[
     raise KeyError(f"Unknown metric_key: {metric_key}")
 
 
+# Operator-String -> Vergleichsfunktion, einmal beim Import statt if-Kette pro Bedingung
+_OPS = {
+    ">=": operator.ge,
+    "<=": operator.le,
+    ">": operator.gt,
+    "<": operator.lt,
+    "==": operator.eq,
+}
+
+
 def _compare(current: Any, op: str, target: Any) -> bool:
-    if op == ">=":
-        return current >= target
-    if op == "<=":
-        return current <= target
-    if op == ">":
-        return current > target
-    if op == "<":
-        return current < target
-    if op == "==":
-        return current == target
-    raise ValueError(f"Unsupported operator: {op}")
+    try:
+        fn = _OPS[op]
+    except KeyError:
+        raise ValueError(f"Unsupported operator: {op}") from None
+    return fn(current, target)
 
 
 def evaluate_country_win_conditions(
     country_key: str,
     *,
     country_metrics: Dict[str, Any],
-    eu_state: Dict[str, Any],
+    eu_state: EUState,
     country_defs: Dict[str, Dict[str, Any]],
 ) -> Tuple[bool, List[ConditionResult]]:
     """
@@ -90,7 +97,7 @@ def evaluate_country_win_conditions(
 def evaluate_all_countries(
     *,
     all_country_metrics: Dict[str, Dict[str, Any]],
-    eu_state: Dict[str, Any],
+    eu_state: EUState,
     country_defs: Dict[str, Dict[str, Any]],
 ) -> Dict[str, Dict[str, Any]]:
     """